@@ -5,6 +5,8 @@ Deze module coördineert tussen de webscraper en de database.
 Het verwerkt de geschraapte data en slaat nieuwe listings op in de database.
 """
 
+import logging
+import os
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
@@ -32,49 +34,50 @@ class Connector:
     4. Bijhouden van nieuwe en verwijderde listings
     """
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, run_date: date = None):
         """
         Initialiseer de connector.
 
         Args:
             db_connection: DataAccess object voor database-operaties
+            run_date: Datum van deze scraper-run (standaard vandaag)
         """
         self.db = db_connection
+        # Eén datum voor de hele run, zodat alle properties dezelfde last_seen krijgen
+        self.run_date = run_date or date.today()
         self.nieuwe_listings = []  # Houdt nieuwe listings bij voor rapportages
         self.log_service = LogService()  # Get the singleton instance
+        self._max_price = self._laad_max_price()  # Prijsfilter uit de configuratie
 
-        # Thread safety
-        self.result_lock = (
-            threading.Lock()
-        )  # Lock for threadsafe access to shared resources
+        # Scrapers worden per type hergebruikt tussen makelaars
+        self._scraper_cache: Dict[str, BaseScraper] = {}
+        self._scraper_cache_lock = threading.Lock()
 
     def verwerk_broker(
-        self, broker_naam: str, scraper_type: str, broker_url: str = None
-    ) -> Tuple[List[Dict], List[Dict]]:
+        self,
+        broker_naam: str,
+        scraper_type: str,
+        broker_url: str = None,
+        broker=None,
+    ) -> List[Dict]:
         """
         Verwerk een makelaar door data te scrapen en de database bij te werken.
 
         Args:
             broker_naam: Naam van de makelaar
             scraper_type: Type scraper (bijvoorbeeld 'vdbunt', 'pararius')
-            broker_url: URL van de makelaar (optioneel, alleen nodig bij nieuwe makelaars)        Returns:
-            Tuple containing (nieuwe_properties, verwijderde_properties)
+            broker_url: URL van de makelaar (optioneel, alleen nodig bij nieuwe makelaars)
+            broker: Al opgehaalde makelaar (optioneel, anders wordt deze opgezocht)
+
+        Returns:
+            De nieuwe properties van deze makelaar. Verdwenen properties worden
+            niet per makelaar bepaald maar opgeruimd in apply_database_updates
         """
         logger.info("Verwerken van makelaar begonnen")
 
         # 1. Controleer of de broker bestaat, zo niet maak deze aan
-        broker = self.db.get_broker_agency_by_name(broker_naam)
-        if not broker:
-            if not broker_url:
-                raise ValueError(
-                    f"Broker URL is required for new broker: {broker_naam}"
-                )
-
-            logger.info("Makelaar wordt aangemaakt")
-            # We gebruiken de BrokerAgency class uit het notebook via een factory function
-            broker = self._create_broker_agency(None, broker_naam, broker_url)
-            broker_id = self.db.create_new_broker_agency(broker)
-            broker.id = broker_id
+        if broker is None:
+            broker = self._get_or_create_broker(broker_naam, broker_url)
 
         # 2. Haal een scraper op voor dit type broker
         scraper = self._get_scraper(scraper_type)
@@ -85,69 +88,108 @@ class Connector:
             f"Makelaar {broker_naam} ({scraper_type}) heeft {len(scraped_properties)} woningen gescraped (voor filtering)."
         )
 
-        # 4. Haal alle bestaande properties op uit de database
-        db_properties = self.db.get_properties_for_broker(broker.id)
+        # 4. Apply price filters from configuration if enabled
+        scraped_properties = self._apply_price_filters(scraped_properties)
 
-        # 5. Vergelijk de data en categoriseer deze
-        nieuwe_properties, _, verwijderde_properties = self._vergelijk_data(
-            scraped_properties, db_properties
+        # 5. Upsert alle geschraapte properties in één statement: nieuwe worden
+        # toegevoegd, van bestaande wordt alleen last_seen bijgewerkt
+        property_objs, properties_per_adres = self._maak_property_objecten(
+            scraped_properties, broker.id
         )
+        ingevoegd = self.db.upsert_properties(property_objs, run_date=self.run_date)
 
-        # Return alleen de resultaten zonder database updates uit te voeren
-        # De daadwerkelijke updates zullen later gecoördineerd worden vanuit de hoofdthread
-
-        # 7. Bewaar unieke nieuwe properties voor rapportage op basis van combinatie van kenmerken
-        # ipv alleen adres
-        unique_nieuwe_listings = []
-        processed_property_keys = set()
+        # 6. Alleen de daadwerkelijk ingevoegde properties zijn nieuw
+        nieuwe_properties = [properties_per_adres[prop.adres] for prop in ingevoegd]
         for prop in nieuwe_properties:
-            adres = prop.get("adres", "").strip().lower()
-            link = prop.get("link", "").strip().lower()
-            huurprijs = prop.get("huurprijs", 0)
+            prop["broker_id"] = broker.id
+
+        logger.info(
+            "Nieuwe properties: %d, Properties waarvan last_seen is bijgewerkt: %d",
+            len(nieuwe_properties),
+            len(property_objs) - len(nieuwe_properties),
+        )
+
+        return nieuwe_properties
 
-            # Maak een unieke sleutel voor deze property
-            unique_key = (adres, link, str(huurprijs))
+    def _get_or_create_broker(self, broker_naam: str, broker_url: str = None):
+        """
+        Haal een makelaar op uit de database, of maak deze aan als hij nog niet bestaat.
+
+        Args:
+            broker_naam: Naam van de makelaar
+            broker_url: URL van de makelaar (alleen nodig bij nieuwe makelaars)
+
+        Returns:
+            De (eventueel nieuw aangemaakte) makelaar
+        """
+        broker = self.db.get_broker_agency_by_name(broker_naam)
+        if not broker:
+            if not broker_url:
+                raise ValueError(
+                    f"Broker URL is required for new broker: {broker_naam}"
+                )
 
-            if unique_key not in processed_property_keys:
-                processed_property_keys.add(unique_key)
-                # Add broker_id to property for later processing
-                prop["broker_id"] = broker.id
-                unique_nieuwe_listings.append(prop)
+            logger.info("Makelaar wordt aangemaakt")
+            # We gebruiken de BrokerAgency class uit het notebook via een factory function
+            broker = self._create_broker_agency(None, broker_naam, broker_url)
+            broker_id = self.db.create_new_broker_agency(broker)
+            # BrokerAgency is immutable, dus maak hem opnieuw aan met het nieuwe ID
+            broker = self._create_broker_agency(broker_id, broker_naam, broker_url)
 
-        return unique_nieuwe_listings, verwijderde_properties
+        return broker
 
     def parallel_process_brokers(
         self, brokers: List[Dict], max_workers=None
-    ) -> Tuple[List[Dict], List[Dict]]:
+    ) -> List[Dict]:
         """
         Verwerk meerdere makelaars parallel met multithreading.
 
         Args:
             brokers: Lijst met dictionaries die broker informatie bevatten (naam, type, url)
-            max_workers: Maximum aantal threads (standaard is None, wat betekent CPUs*5)
+            max_workers: Maximum aantal threads (standaard het aantal makelaars, begrensd
+                door de SCRAPER_WORKERS omgevingsvariabele met een standaard van 10)
 
         Returns:
-            Tuple met (alle_nieuwe_properties, alle_verwijderde_properties)
+            Lijst met de nieuwe properties van alle makelaars
         """
 
         all_nieuwe_properties = []
-        all_verwijderde_properties = []
         futures_to_broker = {}
 
+        # Scrapen is IO-gebonden, dus de pool wordt afgestemd op het aantal
+        # gelijktijdige verbindingen in plaats van op het aantal CPU's
+        workers = max_workers or min(
+            len(brokers), int(os.environ.get("SCRAPER_WORKERS", "10"))
+        )
+
+        # Haal de makelaars vooraf op, zodat de threads alleen hoeven te scrapen
+        # en hun properties te upserten
+        resolved_brokers = {}
+        for broker in brokers:
+            try:
+                resolved_brokers[broker["naam"]] = self._get_or_create_broker(
+                    broker["naam"], broker["url"]
+                )
+            except Exception as exc:
+                logger.error(f"Broker {broker['naam']} could not be resolved: {exc}")
+
         # Gebruik ThreadPoolExecutor om de makelaars parallel te verwerken
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="broker"
+        ) as executor:
             # Start scraping jobs voor elke makelaar
             for broker in brokers:
-                # Name threads for better logging
-                thread_name = f"Thread-{broker['naam']}"
+                resolved = resolved_brokers.get(broker["naam"])
+                if resolved is None:
+                    continue
 
                 # Submit broker to thread pool
                 future = executor.submit(
-                    self._thread_wrapper,
+                    self.verwerk_broker,
                     broker["naam"],
                     broker["type"],
                     broker["url"],
-                    thread_name,
+                    resolved,
                 )
                 futures_to_broker[future] = broker["naam"]
 
@@ -155,56 +197,35 @@ class Connector:
             for future in as_completed(futures_to_broker):
                 broker_name = futures_to_broker[future]
                 try:
-                    nieuwe, verwijderde = future.result()
+                    nieuwe = future.result()
 
-                    # Thread-safe update of the combined results
-                    with self.result_lock:
-                        # Add broker name to each property for email grouping
-                        for prop in nieuwe:
-                            prop["broker_naam"] = broker_name
+                    # as_completed yields in the main thread, which is the sole
+                    # writer of the combined results, so no lock is needed here
+                    # Add broker name to each property for email grouping
+                    for prop in nieuwe:
+                        prop["broker_naam"] = broker_name
 
-                        all_nieuwe_properties.extend(nieuwe)
-                        all_verwijderde_properties.extend(verwijderde)
+                    all_nieuwe_properties.extend(nieuwe)
 
                 except Exception as exc:
                     logger.error(f"Broker {broker_name} generated an exception: {exc}")
 
-        return all_nieuwe_properties, all_verwijderde_properties
+        return all_nieuwe_properties
 
-    def _thread_wrapper(self, broker_naam, scraper_type, broker_url, thread_name):
+    def apply_database_updates(self, nieuwe_properties):
         """
-        Wrapper function for threading to set thread name.
-        """
-        # Set thread name for logging
-        threading.current_thread().name = thread_name
-        return self.verwerk_broker(broker_naam, scraper_type, broker_url)
+        Rond de database-updates af nadat alle makelaars verwerkt zijn.
 
-    def apply_database_updates(self, nieuwe_properties, verwijderde_properties):
-        """
-        Apply all database updates in a synchronized manner.
+        De properties zelf zijn al per makelaar geüpsert in verwerk_broker; hier
+        worden alleen nog de properties opgeruimd die een week niet gezien zijn.
         This should be called from the main thread after parallel scraping is complete.
 
         Args:
-            nieuwe_properties: List of new properties to add
-            verwijderde_properties: List of properties to remove
-        """
-
-        # Process new properties
-        for prop in nieuwe_properties:
-            try:
-                # Get the broker_id that was attached during scraping
-                broker_id = prop.get("broker_id")
-                if not broker_id:
-                    logger.error(
-                        f"Missing broker_id for property: {prop.get('adres', 'unknown')}"
-                    )
-                    continue
-
-                self._verwerk_nieuwe_properties([prop], broker_id)
-
-            except Exception as e:
-                logger.error(f"Error processing new property: {e}")
+            nieuwe_properties: List of new properties that were inserted
 
+        Returns:
+            Tuple met (aantal nieuwe properties, aantal verwijderde properties)
+        """
         # Remove properties that haven't been seen for more than 7 days
         try:
             removed_properties = self.db.remove_old_properties(days_threshold=7)
@@ -212,9 +233,8 @@ class Connector:
             logger.error(f"Error removing old properties: {e}")
             removed_properties = []
 
-        # Store for reporting
-        with self.result_lock:
-            self.nieuwe_listings.extend(nieuwe_properties)
+        # Store for reporting (only called from the main thread)
+        self.nieuwe_listings.extend(nieuwe_properties)
 
         return len(nieuwe_properties), len(removed_properties)
 
@@ -226,13 +246,18 @@ class Connector:
             scraper_type: Type scraper (bijvoorbeeld 'vdbunt', 'pararius')
 
         Returns:
-            Een scraper-instantie
+            Een scraper-instantie, gedeeld met andere makelaars van hetzelfde type
         """
-        try:
-            return ScraperFactory.get_scraper(scraper_type)
-        except ValueError as e:
-            logger.error("Fout bij ophalen scraper: %s", e)
-            raise
+        with self._scraper_cache_lock:
+            scraper = self._scraper_cache.get(scraper_type)
+            if scraper is None:
+                try:
+                    scraper = ScraperFactory.get_scraper(scraper_type)
+                except ValueError as e:
+                    logger.error("Fout bij ophalen scraper: %s", e)
+                    raise
+                self._scraper_cache[scraper_type] = scraper
+            return scraper
 
     def _scrape_properties(
         self, scraper: BaseScraper, max_pages: int = 5
@@ -248,160 +273,54 @@ class Connector:
             Lijst met gescrapede properties
         """
         try:
-            return scraper.get_all_listings(max_pages=max_pages)
+            return scraper.get_all_listings(
+                max_pages=max_pages, max_price=self._max_price
+            )
         except (ValueError, KeyError, AttributeError) as e:
             logger.error("Fout bij scrapen van properties: %s", e)
             return []
 
-    def _vergelijk_data(self, scraped_properties, db_properties):
+    def _maak_property_objecten(
+        self, properties: List[Dict], broker_id: int
+    ) -> Tuple[List, Dict[str, Dict]]:
         """
-        Vergelijk gescrapede data met database-data.
+        Zet geschraapte properties om naar Property objecten voor de upsert.
 
         Args:
-            scraped_properties: Properties van de scraper
-            db_properties: Properties uit de database
+            properties: Lijst met geschraapte properties
+            broker_id: ID van de makelaar
 
         Returns:
-            Tuple met (nieuwe_properties, bestaande_properties, verwijderde_properties)
-        """
-        # Apply price filters from configuration if enabled
-        scraped_properties = self._apply_price_filters(scraped_properties)
-
-        # Maak een dictionary van database properties om duplicaten te vinden
-        # We gebruiken nu een combinatie van adres, link en prijs als unieke sleutel
-        db_properties_dict = {}
-
-        for prop in db_properties:
-            # Gebruik een tuple van kenmerken als unieke identificatie
-            unique_key = (
-                prop.adres.strip().lower() if prop.adres else "",
-                prop.link.strip().lower() if prop.link else "",
-                str(prop.huurprijs) if prop.huurprijs is not None else "",
-            )
-            db_properties_dict[unique_key] = prop
-
-        # Categoriseer de data
-        nieuwe_properties = []
-        bestaande_properties = []
-        scraped_unique_keys = set()
-        # Set om dubbele geschraapde properties te detecteren
-        seen_scraped_keys = set()
-        for prop in scraped_properties:
-            adres = prop.get("adres", "").strip().lower()
-            link = prop.get("link", "").strip().lower()
-            huurprijs = prop.get("huurprijs", 0)
-
-            # Maak een unieke sleutel voor deze property
-            unique_key = (adres, link, str(huurprijs))
-
-            # Als we deze property al eerder hebben gezien in de huidige scrape-run, skip
-            if unique_key in seen_scraped_keys:
-                logger.debug(
-                    "Duplicate geschraapte property overgeslagen: %s", prop.get("adres")
-                )
-                continue
-
-            # Markeer deze property als gezien
-            seen_scraped_keys.add(unique_key)
-
-            # Houd bij welke unique keys we hebben gezien voor het bepalen van verwijderde properties
-            scraped_unique_keys.add(unique_key)
-
-            # Als deze combinatie van kenmerken al bestaat, is het een bestaande property
-            if unique_key in db_properties_dict:
-                bestaande_properties.append(prop)
-                # Update last_seen for existing property
-                db_prop = db_properties_dict[unique_key]
-                self.db.update_property_last_seen(db_prop.makelaardij_id, db_prop.adres)
-            else:
-                nieuwe_properties.append(prop)
-
-        # Voor verwijderde properties gebruiken we nu de remove_old_properties methode
-        # Die verwijdert alleen properties die al een week niet gezien zijn
-        # We returnen geen verwijderde properties hier omdat die later worden afgehandeld
-        verwijderde_properties = []
-
-        logger.info(
-            "Nieuwe properties: %d, Bestaande properties: %d, Properties waarvan last_seen is bijgewerkt: %d",
-            len(nieuwe_properties),
-            len(bestaande_properties),
-            len(
-                bestaande_properties
-            ),  # Alle bestaande properties krijgen een last_seen update
-        )
-
-        return nieuwe_properties, bestaande_properties, verwijderde_properties
-
-    def _verwerk_nieuwe_properties(self, nieuwe_properties, broker_id):
-        """
-        Verwerk nieuwe properties door ze aan de database toe te voegen.
-
-        Args:
-            nieuwe_properties: Lijst met nieuwe properties
-            broker_id: ID van de makelaar
+            Tuple met (Property objecten, geschraapte property per adres)
         """
-        vandaag = date.today()
-
-        # Bijhouden van al toegevoegde properties binnen deze functie-aanroep
-        # om dubbele logging te voorkomen
-        added_property_keys = set()
-
-        # Bestaande properties ophalen om te controleren op dubbele invoer
-        bestaande_properties = self.db.get_properties_for_broker(broker_id)
-        bestaande_property_keys = set()
-
-        # Database property keys maken voor snelle controle
-        for prop in bestaande_properties:
-            bestaande_property_keys.add(
-                (
-                    prop.adres.strip().lower() if prop.adres else "",
-                    prop.link.strip().lower() if prop.link else "",
-                    str(prop.huurprijs) if prop.huurprijs is not None else "",
-                )
-            )
+        # Een adres komt maar één keer per makelaar in de database; de eerste
+        # geschraapte property per adres wint
+        properties_per_adres = {}
+        property_objs = []
 
-        for prop in nieuwe_properties:
+        for prop in properties:
             try:
-                adres = prop.get("adres", "").strip().lower()
-                link = prop.get("link", "").strip().lower()
-                huurprijs = prop.get("huurprijs", 0)
-
-                # Maak een unieke sleutel voor deze property
-                unique_key = (adres, link, str(huurprijs))
-
-                # Sla over als we deze property al hebben toegevoegd in deze run
-                if unique_key in added_property_keys:
-                    logger.debug(
-                        "Property wordt overgeslagen (duplicaat in huidige run): %s",
-                        prop["adres"],
-                    )
-                    continue
-
-                # Sla over als de property al in de database bestaat
-                if unique_key in bestaande_property_keys:
-                    logger.debug(
-                        "Property wordt overgeslagen (bestaat al in database): %s",
-                        prop["adres"],
-                    )
+                if prop["adres"] in properties_per_adres:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Property wordt overgeslagen (duplicaat in huidige run): %s",
+                            prop["adres"],
+                        )
                     continue
 
-                # Markeer als toegevoegd
-                added_property_keys.add(unique_key)
-
                 # Converteer het dictionary naar een Property object via een factory functie
                 property_obj = self._create_property(
                     makelaardij_id=broker_id,
                     adres=prop["adres"],
                     link=prop["link"],
-                    toegevoegd_op=vandaag,
+                    toegevoegd_op=self.run_date,
                     naam_dorp_stad=prop["naam_dorp_stad"],
                     huurprijs=prop["huurprijs"],
                     oppervlakte=prop["oppervlakte"],
                 )
 
-                # Voeg toe aan de database
-                self.db.create_new_rental_property(property_obj)
-                logger.debug("Nieuwe property toegevoegd: %s", prop["adres"])
+                properties_per_adres[prop["adres"]] = prop
+                property_objs.append(property_obj)
 
             except KeyError as e:
                 logger.error("Ontbrekende key in property data: %s", e)
@@ -412,19 +331,7 @@ class Connector:
                     e,
                 )
 
-    def _verwerk_verwijderde_properties(self, verwijderde_properties):
-        """
-        Verwerk verwijderde properties door ze uit de database te verwijderen.
-
-        Args:
-            verwijderde_properties: Lijst met verwijderde properties
-        """
-        for prop in verwijderde_properties:
-            try:
-                self.db.remove_property(prop.makelaardij_id, prop.adres)
-                logger.debug("Property verwijderd: %s", prop.adres)
-            except (ValueError, AttributeError) as e:
-                logger.error("Fout bij verwijderen van property %s: %s", prop.adres, e)
+        return property_objs, properties_per_adres
 
     def verstuur_email_met_nieuwe_listings(self, mail_service, recipients):
         """
@@ -452,15 +359,12 @@ class Connector:
             self.log_service.log_email_sent(False, [])
             return False
 
-    def _apply_price_filters(self, properties):
+    def _laad_max_price(self):
         """
-        Filter properties based on price settings from the configuration.
-
-        Args:
-            properties: List of properties to filter
+        Lees het maximale-prijsfilter eenmalig uit de configuratie.
 
         Returns:
-            Filtered list of properties
+            De maximale huurprijs, of None als er niet op prijs gefilterd wordt
         """
         try:
             # Import config here to avoid circular imports
@@ -468,43 +372,51 @@ class Connector:
 
             # Skip filtering if global filtering is disabled
             if not FILTERS.get("FILTERING_ENABLED", False):
-                return properties
+                return None
 
-            filtered_properties = []
-
-            # Apply max price filter if enabled
             max_price_filter = FILTERS.get(
                 "MAX_PRICE_FILTER", {"enabled": False, "max_price": 0}
             )
+            if not max_price_filter.get("enabled", False):
+                return None
 
-            if max_price_filter.get("enabled", False):
-                max_price = max_price_filter.get("max_price", 0)
+            return max_price_filter.get("max_price", 0)
 
-                for prop in properties:
-                    price = prop.get("huurprijs", 0)
+        except (ImportError, KeyError) as e:
+            logger.error(f"Error loading price filters: {e}")
+            return None
 
-                    # Skip properties with no price
-                    if price == 0:
-                        filtered_properties.append(prop)
-                        continue
+    def _apply_price_filters(self, properties):
+        """
+        Filter properties based on the price settings loaded from the configuration.
 
-                    # Only include properties with price less than or equal to max_price
-                    if price <= max_price:
-                        filtered_properties.append(prop)
-                    else:
-                        logger.debug(
-                            f"Property filtered out due to price (€{price} > €{max_price}): {prop.get('adres', 'unknown')}"
-                        )
+        The scrapers already skip properties above the maximum price; this is a
+        safety net for scrapers that return listings through another path.
 
-                return filtered_properties
+        Args:
+            properties: List of properties to filter
 
-            # If max price filter is disabled, return all properties
+        Returns:
+            Filtered list of properties
+        """
+        max_price = self._max_price
+        if max_price is None:
             return properties
 
-        except (ImportError, KeyError) as e:
-            logger.error(f"Error applying price filters: {e}")
-            # If there's an error, return the original list
-            return properties
+        # Properties without a known price (None) are kept and mailed as "Onbekend"
+        filtered_properties = [
+            prop
+            for prop in properties
+            if (price := prop.get("huurprijs")) is None or price <= max_price
+        ]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%d properties filtered out due to price (> €%s)",
+                len(properties) - len(filtered_properties),
+                max_price,
+            )
+        return filtered_properties
 
     # Factory functies die Property en BrokerAgency objecten maken met de juiste klassen
     # Deze worden geïmplementeerd in de HuurhuisWebscraper notebook
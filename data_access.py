@@ -1,12 +1,55 @@
 # filepath: c:\Users\User\Documents\GitHub\Makelaar-webscraper\data_access.py
+from __future__ import annotations
+
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import date
 from typing import List, Optional
 
-import psycopg2
-
-
-@dataclass
+from psycopg2.extensions import connection as _PgConnection
+from psycopg2.extras import NamedTupleCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from utils import normalize_price
+
+# Rows per execute_values statement: large enough to send all listings of a broker
+# in one round-trip while keeping the generated query string bounded
+_PAGE_SIZE = 5000
+
+# Statements that are executed often enough to keep their plan on the server
+_PREPARED_STATEMENTS = """
+    PREPARE get_broker(text) AS
+        SELECT broker_id, broker_name, hyperlink
+        FROM broker_agencies
+        WHERE broker_name = $1;
+"""
+
+# Static SQL of the write and lookup paths, encoded once so psycopg2 does not have
+# to encode the query string again on every call
+_SQL_UPSERT_PROPS = b"""
+    INSERT INTO property (broker_id, adres, hyperlink, price, size, last_seen)
+    VALUES %s
+    ON CONFLICT (broker_id, adres) DO UPDATE SET
+        hyperlink = EXCLUDED.hyperlink,
+        price = EXCLUDED.price,
+        size = EXCLUDED.size,
+        last_seen = EXCLUDED.last_seen
+    RETURNING broker_id, adres, (xmax = 0) AS inserted
+"""
+_SQL_GET_BROKER = b"EXECUTE get_broker(%s)"
+
+
+class PreparedConnection(_PgConnection):
+    """Connection that prepares the frequently used statements once on connect."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        with self.cursor() as cursor:
+            cursor.execute(_PREPARED_STATEMENTS)
+        self.commit()
+
+
+@dataclass(slots=True, frozen=True)
 class BrokerAgency:
     """Class for keeping track of broker agencies."""
 
@@ -15,23 +58,39 @@ class BrokerAgency:
     link: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Property:
     """Class for keeping track of rental properties."""
 
     makelaardij_id: int
     adres: str
     link: str
-    toegevoegd_op: date
-    naam_dorp_stad: str
-    huurprijs: str
+    huurprijs: Optional[int]
     oppervlakte: str
+    toegevoegd_op: Optional[date] = None
+    naam_dorp_stad: str = "Onbekend"
     last_seen: Optional[date] = None
 
 
+def _property_from_row(row) -> Property:
+    """Build a Property from a NamedTupleCursor row of the property table."""
+    return Property(
+        makelaardij_id=row.broker_id,
+        adres=row.adres,
+        link=row.hyperlink,
+        huurprijs=normalize_price(row.price),
+        oppervlakte=row.size,
+        last_seen=row.last_seen,
+    )
+
+
 class DataAccess:
-    def __init__(self):
-        """Initialize database connection using settings from webscraper_config.py."""
+    def __init__(self, max_connections: int = 16):
+        """Initialize database connection using settings from webscraper_config.py.
+
+        Args:
+            max_connections: Expected number of concurrent users of the connection pool
+        """
         # Import config here to avoid circular imports
         from webscraper_config import DATABASE
 
@@ -43,9 +102,31 @@ class DataAccess:
             "port": DATABASE["port"],
         }
 
+        # Connections are reused across calls and worker threads instead of
+        # performing a full connect/auth handshake for every query
+        self._pool = ThreadedConnectionPool(
+            minconn=2,
+            maxconn=max(8, max_connections),
+            connection_factory=PreparedConnection,
+            **self.connection_params,
+        )
+
+    def close(self) -> None:
+        """Close all pooled database connections."""
+        self._pool.closeall()
+
+    @contextmanager
     def get_connection(self):
-        """Create and return a database connection."""
-        return psycopg2.connect(**self.connection_params)
+        """Borrow a connection from the pool and commit or roll back on exit."""
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
 
     # Create Operations
     def create_new_broker_agency(self, agency: BrokerAgency) -> int:
@@ -62,102 +143,61 @@ class DataAccess:
                 )
                 return cursor.fetchone()[0]
 
-    def create_new_rental_property(self, prop: Property) -> None:
-        """Create a new rental property."""
+    def upsert_properties(
+        self, props: List[Property], run_date: Optional[date] = None
+    ) -> List[Property]:
+        """Insert new properties and refresh existing ones in one statement.
+
+        Args:
+            props: All currently listed properties of one or more broker agencies
+            run_date: last_seen date for properties without one (default: today)
+
+        Returns:
+            The properties that were newly inserted
+        """
+        if not props:
+            return []
+
+        # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement
+        unique_props = {}
+        for p in props:
+            unique_props.setdefault((p.makelaardij_id, p.adres), p)
+
+        run_date = run_date or date.today()
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    INSERT INTO property (broker_id, adres, hyperlink, price, size, last_seen)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        prop.makelaardij_id,
-                        prop.adres,
-                        prop.link,
-                        prop.huurprijs,
-                        prop.oppervlakte,
-                        prop.last_seen or date.today(),
-                    ),
+                # xmax is 0 only for rows inserted by this statement
+                rows = execute_values(
+                    cursor,
+                    _SQL_UPSERT_PROPS,
+                    [
+                        (
+                            p.makelaardij_id,
+                            p.adres,
+                            p.link,
+                            p.huurprijs,
+                            p.oppervlakte,
+                            p.last_seen or run_date,
+                        )
+                        for p in unique_props.values()
+                    ],
+                    page_size=_PAGE_SIZE,
+                    fetch=True,
                 )
+        return [unique_props[(row[0], row[1])] for row in rows if row[2]]
 
     # Read Operations
     def get_broker_agency_by_name(self, agency_name: str) -> Optional[BrokerAgency]:
         """Get a broker agency by name."""
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT broker_id, broker_name, hyperlink
-                    FROM broker_agencies
-                    WHERE broker_name = %s
-                    """,
-                    (agency_name,),
-                )
+                cursor.execute(_SQL_GET_BROKER, (agency_name,))
                 result = cursor.fetchone()
                 if result:
                     return BrokerAgency(id=result[0], naam=result[1], link=result[2])
                 return None
 
-    def get_properties_for_broker(self, agency_id: int) -> List[Property]:
-        """Get all properties for a specific broker agency."""
-        with self.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT broker_id, adres, hyperlink, CURRENT_DATE, 'Onbekend', price, size, last_seen
-                    FROM property
-                    WHERE broker_id = %s
-                    """,
-                    (agency_id,),
-                )
-                results = cursor.fetchall()
-                return [
-                    Property(
-                        makelaardij_id=row[0],
-                        adres=row[1],
-                        link=row[2],
-                        toegevoegd_op=row[3],
-                        naam_dorp_stad=row[4],
-                        huurprijs=row[5],
-                        oppervlakte=row[6],
-                        last_seen=row[7],
-                    )
-                    for row in results
-                ]
-
     # Delete Operations
-    def remove_property(self, makelaardij_id: int, adres: str) -> None:
-        """Remove a property from the database."""
-        with self.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    DELETE FROM property
-                    WHERE broker_id = %s AND adres = %s
-                    """,
-                    (makelaardij_id, adres),
-                )
-
-    # Update Operations
-    def update_property_last_seen(
-        self, makelaardij_id: int, adres: str, last_seen_date: date = None
-    ) -> None:
-        """Update the last_seen date for a property."""
-        if last_seen_date is None:
-            last_seen_date = date.today()
-
-        with self.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    UPDATE property 
-                    SET last_seen = %s 
-                    WHERE broker_id = %s AND adres = %s
-                    """,
-                    (last_seen_date, makelaardij_id, adres),
-                )
-
     def remove_old_properties(self, days_threshold: int = 7) -> List[Property]:
         """Remove properties that haven't been seen for more than the specified number of days.
 
@@ -168,37 +208,14 @@ class DataAccess:
             List of removed properties
         """
         with self.get_connection() as conn:
-            with conn.cursor() as cursor:
-                # First, get the properties that will be removed
-                cursor.execute(
-                    """
-                    SELECT broker_id, adres, hyperlink, CURRENT_DATE, 'Onbekend', price, size, last_seen
-                    FROM property
-                    WHERE last_seen < CURRENT_DATE - INTERVAL '%s days'
-                    """,
-                    (days_threshold,),
-                )
-                removed_properties = [
-                    Property(
-                        makelaardij_id=row[0],
-                        adres=row[1],
-                        link=row[2],
-                        toegevoegd_op=row[3],
-                        naam_dorp_stad=row[4],
-                        huurprijs=row[5],
-                        oppervlakte=row[6],
-                        last_seen=row[7],
-                    )
-                    for row in cursor.fetchall()
-                ]
-
-                # Then remove them
+            with conn.cursor(cursor_factory=NamedTupleCursor) as cursor:
+                # Delete and return the removed rows in a single statement
                 cursor.execute(
                     """
                     DELETE FROM property
-                    WHERE last_seen < CURRENT_DATE - INTERVAL '%s days'
+                    WHERE last_seen < CURRENT_DATE - make_interval(days => %s)
+                    RETURNING broker_id, adres, hyperlink, price, size, last_seen
                     """,
                     (days_threshold,),
                 )
-
-                return removed_properties
+                return [_property_from_row(row) for row in cursor.fetchall()]
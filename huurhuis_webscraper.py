@@ -73,11 +73,8 @@ def run_scraper_proces():
     log_service = LogService()
     logger = get_logger("HuurhuisWebscraper")
 
-    # Initialiseer de database-verbinding
-    db = DataAccess()
-
-    # Initialiseer de connector met onze aangepaste versie
-    communicatie = Huurhuisconnector(db)
+    # Eén datum voor de hele run in plaats van date.today() per property
+    run_date = date.today()
 
     # Lijst met te verwerken makelaars en hun scraper-type
     makelaars = [
@@ -151,18 +148,26 @@ def run_scraper_proces():
     # Set main thread name for better logging
     threading.current_thread().name = "MainThread"
 
-    # Process brokers in parallel and gather results
-    # Use max_workers based on number of brokers - for 4 brokers, use 4 threads
-    max_workers = len(makelaars)
+    # Initialiseer de database-verbinding, met een pool die groot genoeg is voor
+    # alle makelaar-threads plus de hoofdthread
+    db = DataAccess(max_connections=len(makelaars) + 1)
 
-    alle_nieuwe_properties, alle_verwijderde_properties = (
-        communicatie.parallel_process_brokers(makelaars, max_workers=max_workers)
-    )
+    # Initialiseer de connector met onze aangepaste versie
+    communicatie = Huurhuisconnector(db, run_date=run_date)
 
-    # After all scrapers have completed, synchronously apply database updates
-    communicatie.apply_database_updates(
-        alle_nieuwe_properties, alle_verwijderde_properties
-    )
+    try:
+        # Process brokers in parallel; each broker upserts its own properties
+        # The connector sizes the thread pool for IO-bound scraping (SCRAPER_WORKERS)
+        alle_nieuwe_properties = communicatie.parallel_process_brokers(makelaars)
+
+        # After all scrapers have completed, purge properties that are no longer listed;
+        # this is the only place where removed properties are determined
+        _, aantal_verwijderde_properties = communicatie.apply_database_updates(
+            alle_nieuwe_properties
+        )
+    finally:
+        # Sluit alle verbindingen in de pool
+        db.close()
 
     # Verstuur mail met nieuwe woningen
     if alle_nieuwe_properties:
@@ -172,9 +177,13 @@ def run_scraper_proces():
         mail_service = MailService()
 
         # Verstuur de mail met nieuwe woningen
-        mail_success = mail_service.send_new_properties_email(
-            None, alle_nieuwe_properties
-        )
+        try:
+            mail_success = mail_service.send_new_properties_email(
+                None, alle_nieuwe_properties
+            )
+        finally:
+            # Sluit de SMTP-sessie die de mail service hergebruikt
+            mail_service.close()
 
         if mail_success:
             logger.info(
@@ -184,9 +193,7 @@ def run_scraper_proces():
             logger.error("There was a problem sending the email.")
 
     # Log application end
-    log_service.log_app_end(
-        len(alle_nieuwe_properties), len(alle_verwijderde_properties)
-    )
+    log_service.log_app_end(len(alle_nieuwe_properties), aantal_verwijderde_properties)
 
 
 if __name__ == "__main__":
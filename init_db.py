@@ -4,6 +4,8 @@ Het maakt de benodigde tabellen aan als ze nog niet bestaan.
 """
 
 import psycopg2
+import random
+import socket
 import time
 from webscraper_config import DATABASE
 
@@ -12,14 +14,43 @@ from log_service import get_logger
 
 logger = get_logger(__name__)
 
+# Alle objecten die init_database aanmaakt; als ze allemaal bestaan is er niets te doen.
+# De unieke index is nodig voor de ON CONFLICT upserts in DataAccess, en de overbodige
+# property_broker_id_idx mag niet meer bestaan
+SCHEMA_PROBE_SQL = """
+SELECT to_regclass('public.broker_agencies'),
+       to_regclass('public.property'),
+       (SELECT 1 FROM information_schema.columns
+         WHERE table_schema = 'public'
+           AND table_name = 'property'
+           AND column_name = 'last_seen'),
+       to_regclass('public.idx_property_broker_adres'),
+       to_regclass('public.idx_property_last_seen'),
+       to_regclass('public.idx_broker_name'),
+       CASE WHEN to_regclass('public.property_broker_id_idx') IS NULL THEN 1 END
+"""
+
 
 def wait_for_db():
-    """Wacht tot de database beschikbaar is."""
+    """
+    Wacht tot de database beschikbaar is.
+
+    Returns:
+        De geopende verbinding, of None als de database niet bereikbaar werd
+    """
     max_retries = 30
-    retry_interval = 2
+    # Exponentiële backoff met jitter: begint kort en loopt op tot maximaal 5 seconden
+    base_delay = 0.25
+    max_delay = 5.0
 
     for attempt in range(max_retries):
         try:
+            # Controleer eerst goedkoop of de poort open is, voordat de volledige
+            # verbinding met authenticatie wordt opgezet
+            with socket.create_connection(
+                (DATABASE["host"], DATABASE["port"]), timeout=1
+            ):
+                pass
             connection = psycopg2.connect(
                 dbname=DATABASE["dbname"],
                 user=DATABASE["user"],
@@ -27,70 +58,55 @@ def wait_for_db():
                 host=DATABASE["host"],
                 port=DATABASE["port"],
             )
-            connection.close()
             logger.info("Database is beschikbaar. Verbinding succesvol.")
-            return True
-        except psycopg2.OperationalError:
+            return connection
+        except (OSError, psycopg2.OperationalError):
             logger.info("Wachten op database... Poging %d/%d", attempt + 1, max_retries)
-            time.sleep(retry_interval)
+            delay = min(max_delay, base_delay * (2**attempt))
+            time.sleep(delay * random.uniform(0.5, 1.5))
 
     logger.error("Kon geen verbinding maken met de database na meerdere pogingen.")
-    return False
+    return None
 
 
 def init_database():
     """Maakt de benodigde tabellen aan als ze nog niet bestaan."""
-    if not wait_for_db():
+    # Hergebruik de verbinding uit wait_for_db in plaats van opnieuw te verbinden
+    connection = wait_for_db()
+    if connection is None:
         return False
 
     try:
-        # Maak verbinding met de database
-        connection = psycopg2.connect(
-            dbname=DATABASE["dbname"],
-            user=DATABASE["user"],
-            password=DATABASE["password"],
-            host=DATABASE["host"],
-            port=DATABASE["port"],
-        )
         connection.autocommit = True
-        cursor = connection.cursor()  # Create sequences first if they don't exist
-        cursor.execute(
-            """
-        CREATE SEQUENCE IF NOT EXISTS broker_agencies_broker_id_seq
-            INCREMENT 1
-            START 1
-            MINVALUE 1
-            MAXVALUE 2147483647
-            CACHE 1;
-
-        CREATE SEQUENCE IF NOT EXISTS property_property_id_seq
-            INCREMENT 1
-            START 1
-            MINVALUE 1
-            MAXVALUE 2147483647
-            CACHE 1;
-        """
-        )
+        cursor = connection.cursor()
+
+        # Controleer met één catalogus-query of het schema al up-to-date is; bij een
+        # warme start hoeft dan geen enkel DDL-statement uitgevoerd te worden
+        cursor.execute(SCHEMA_PROBE_SQL)
+        probe = cursor.fetchone()
+        if all(value is not None for value in probe):
+            cursor.close()
+            logger.info("Database schema is al up-to-date, initialisatie overgeslagen.")
+            return True
 
-        # Maak broker_agencies tabel aan
-        cursor.execute(
-            """
+        # Maak broker_agencies tabel aan. De id-kolommen zijn identity-kolommen, zodat
+        # er geen losse sequences aangemaakt hoeven te worden; bestaande tabellen met
+        # een nextval-default blijven gewoon werken
+        broker_sql = """
         CREATE TABLE IF NOT EXISTS public.broker_agencies
         (
-            broker_id integer NOT NULL DEFAULT nextval('broker_agencies_broker_id_seq'::regclass),
+            broker_id integer GENERATED BY DEFAULT AS IDENTITY,
             broker_name text COLLATE pg_catalog."default" NOT NULL,
             hyperlink text COLLATE pg_catalog."default" NOT NULL,
             CONSTRAINT broker_agencies_pkey PRIMARY KEY (broker_id)
-        )
+        );
         """
-        )
 
         # Maak properties tabel aan
-        cursor.execute(
-            """
+        property_sql = """
         CREATE TABLE IF NOT EXISTS public.property
         (
-            property_id integer NOT NULL DEFAULT nextval('property_property_id_seq'::regclass),
+            property_id integer GENERATED BY DEFAULT AS IDENTITY,
             broker_id integer,
             adres text COLLATE pg_catalog."default",
             hyperlink text COLLATE pg_catalog."default",
@@ -102,32 +118,58 @@ def init_database():
                 REFERENCES public.broker_agencies (broker_id) MATCH SIMPLE
                 ON UPDATE NO ACTION
                 ON DELETE NO ACTION
-        )
+        );
         """
-        )
 
         # Voeg last_seen kolom toe aan bestaande property tabellen als deze nog niet bestaat
-        cursor.execute(
-            """
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1 FROM information_schema.columns 
-                WHERE table_name = 'property' 
-                AND column_name = 'last_seen'
-                AND table_schema = 'public'
-            ) THEN
-                ALTER TABLE public.property ADD COLUMN last_seen date DEFAULT CURRENT_DATE;
-            END IF;
-        END $$;
+        last_seen_sql = """
+        ALTER TABLE public.property ADD COLUMN IF NOT EXISTS last_seen date DEFAULT CURRENT_DATE;
+        """
+
+        # Eenmalige migratie: verwijder dubbele (broker_id, adres) rijen zodat de unieke
+        # index aangemaakt kan worden; de meest recente rij blijft bewaard
+        dedup_sql = """
+        DELETE FROM public.property a
+            USING public.property b
+            WHERE a.broker_id = b.broker_id
+            AND a.adres = b.adres
+            AND a.property_id < b.property_id;
         """
-        )  # Controleer of er tabellen zijn aangemaakt
+
+        # Indexen voor de WHERE-clausules van de DataAccess queries. De unieke index
+        # op (broker_id, adres) dient ook voor het ophalen van properties per makelaar
+        index_sql = """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_property_broker_adres
+            ON public.property (broker_id, adres);
+        DROP INDEX IF EXISTS property_broker_id_idx;
+        CREATE INDEX IF NOT EXISTS idx_property_last_seen
+            ON public.property (last_seen);
+        CREATE INDEX IF NOT EXISTS idx_broker_name
+            ON public.broker_agencies (broker_name);
+        """
+
+        # Voer de tabel-DDL in één round-trip uit; elk statement is idempotent
+        cursor.execute("\n".join([broker_sql, property_sql, last_seen_sql]))
+
+        # Ontdubbel alleen zolang de unieke index nog ontbreekt; de vierde kolom van
+        # de schema-probe is to_regclass('public.idx_property_broker_adres')
+        unique_index_missing = probe[3] is None
+        if unique_index_missing:
+            cursor.execute(dedup_sql)
+            logger.warning(
+                "Migratie: %d dubbele properties verwijderd voor de unieke index "
+                "idx_property_broker_adres",
+                cursor.rowcount,
+            )
+
+        cursor.execute(index_sql)
+
+        # Controleer of er tabellen zijn aangemaakt
         cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
         tables = cursor.fetchall()
         logger.info("Aangemaakte tabellen: %s", [table[0] for table in tables])
 
         cursor.close()
-        connection.close()
 
         logger.info("Database schema is succesvol geïnitialiseerd.")
         return True
@@ -136,6 +178,9 @@ def init_database():
         logger.error("Fout bij het initialiseren van het database schema: %s", e)
         return False
 
+    finally:
+        connection.close()
+
 
 if __name__ == "__main__":
     logger.info("Database initialisatie script wordt uitgevoerd...")
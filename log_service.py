@@ -6,12 +6,49 @@ to ensure consistent logging focused on stdout (standard Docker practice) with
 optional file logging when not running in Docker.
 """
 
+import atexit
+import functools
+import json
 import logging
 import os
+import queue
 import sys
 import threading
 from datetime import datetime
-from typing import List, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Union
+
+# Add file logging only when we can explicitly detect we're NOT in a container.
+# Default behavior: assume Docker/container environment (stdout logging).
+# Evaluated once at import, so the environment and /.dockerenv are checked only once
+_IS_LOCAL_DEVELOPMENT = os.environ.get("DOCKER_ENVIRONMENT", "").lower() == "false" or (
+    not os.path.exists("/.dockerenv")  # No Docker indicator file
+    and os.environ.get("container") is None  # No container env var
+    and os.environ.get("DOCKER_ENVIRONMENT") is None  # No explicit Docker env
+    and os.name == "nt"  # Running on Windows (likely local development)
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formatter that writes every record as a single compact JSON object.
+
+    json.dumps takes care of escaping, so quotes or newlines in a message no longer
+    produce invalid JSON for the container logging system. Records arrive through the
+    QueueHandler, which has already appended any traceback to the message and cleared
+    exc_info, so a traceback ends up escaped inside the "message" field.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the record as a JSON line."""
+        entry = {
+            "time": self.formatTime(record),
+            "thread": record.threadName,
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry, separators=(",", ":"))
 
 
 class LogService:
@@ -24,6 +61,8 @@ class LogService:
 
     _instance = None
     _initialized = False
+    # Guards the one-time setup when worker threads request a logger concurrently
+    _init_lock = threading.Lock()
 
     def __new__(cls):
         """Singleton pattern to ensure only one logger instance exists."""
@@ -36,40 +75,39 @@ class LogService:
         if LogService._initialized:
             return
 
+        with LogService._init_lock:
+            # Another thread may have finished the setup while we waited
+            if LogService._initialized:
+                return
+            self._setup()
+
+        # Log start of application
+        self.log_app_start()
+
+    def _setup(self) -> None:
+        """Configure the root logger and its handlers."""
         # Set up root logger
         self.root_logger = logging.getLogger()
         self.root_logger.setLevel(logging.INFO)
 
-        # Remove existing handlers to avoid duplicate logs
-        for handler in self.root_logger.handlers[:]:
-            self.root_logger.removeHandler(handler)
+        # Remove existing handlers to avoid duplicate logs; close them first so their
+        # streams/files are released instead of only being detached
+        for handler in self.root_logger.handlers:
+            handler.close()
+        self.root_logger.handlers.clear()
 
         # Create console handler with thread information (Docker standard practice)
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
 
-        # Use JSON-like format for better parsing in container logging systems
-        console_format = logging.Formatter(
-            '{"time": "%(asctime)s", "thread": "%(threadName)s", "name": "%(name)s", "level": "%(levelname)s", "message": "%(message)s"}'
-        )
-        console_handler.setFormatter(console_format)
-
-        # Add console handler to the root logger (always needed)
-        self.root_logger.addHandler(console_handler)
-
-        # Add file logging only when we can explicitly detect we're NOT in a container
-        # Default behavior: assume Docker/container environment (stdout logging)
-        # Only add file logging when we can confirm we're running locally
-        is_local_development = os.environ.get(
-            "DOCKER_ENVIRONMENT", ""
-        ).lower() == "false" or (
-            not os.path.exists("/.dockerenv")  # No Docker indicator file
-            and os.environ.get("container") is None  # No container env var
-            and os.environ.get("DOCKER_ENVIRONMENT") is None  # No explicit Docker env
-            and os.name == "nt"
-        )  # Running on Windows (likely local development)
-
-        if is_local_development:
+        # Use JSON format for better parsing in container logging systems
+        console_handler.setFormatter(JSONFormatter())
+
+        # The console handler is always needed
+        handlers = [console_handler]
+
+        # Add file logging only when we're running locally (see _IS_LOCAL_DEVELOPMENT)
+        if _IS_LOCAL_DEVELOPMENT:
             # Create logs directory if it doesn't exist (only for non-Docker environments)
             log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
             if not os.path.exists(log_dir):
@@ -81,8 +119,15 @@ class LogService:
                 log_dir, f"huurhuis_webscraper_{current_time}.log"
             )
 
-            # Create file handler for summary log with thread information
-            file_handler = logging.FileHandler(log_filename)
+            # Create file handler for summary log with thread information. The file is
+            # only opened on the first record and rotated so it can't grow unbounded
+            file_handler = RotatingFileHandler(
+                log_filename,
+                maxBytes=10_000_000,
+                backupCount=3,
+                delay=True,
+                encoding="utf-8",
+            )
             file_handler.setLevel(logging.INFO)
             file_format = logging.Formatter(
                 "%(asctime)s - [%(threadName)s] - %(levelname)s - %(message)s"
@@ -90,14 +135,20 @@ class LogService:
             file_handler.setFormatter(file_format)
 
             # Add file handler only in non-Docker environments
-            self.root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        # Worker threads only put records on a queue; a single background listener
+        # thread does the formatting and the actual stdout/file writes
+        log_queue = queue.SimpleQueue()
+        self.root_logger.addHandler(QueueHandler(log_queue))
+        self._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        # Flush the remaining records when the application exits
+        atexit.register(self._listener.stop)
 
         # Set initialization flag
         LogService._initialized = True
 
-        # Log start of application
-        self.log_app_start()
-
     def get_logger(self, name: str) -> logging.Logger:
         """
         Get a named logger that will use the centralized configuration.
@@ -111,49 +162,45 @@ class LogService:
         return logging.getLogger(name)
 
     def log_app_start(self) -> None:
-        """Log the application start time."""
+        """Log the application start; the time is part of every formatted record."""
         self.root_logger.info("===== HuurhuisWebscraper Started =====")
-        self.root_logger.info(
-            f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        )
 
     def log_app_end(
         self, new_properties_count: int, removed_properties_count: int
     ) -> None:
         """
-        Log the application end time and summary statistics.
+        Log the application end and summary statistics.
 
         Args:
             new_properties_count: Number of new properties found
             removed_properties_count: Number of properties removed from the database
         """
         self.root_logger.info("===== HuurhuisWebscraper Completed =====")
-        self.root_logger.info(
-            f"End time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        )
-        self.root_logger.info(f"New properties found: {new_properties_count}")
-        self.root_logger.info(f"Properties removed: {removed_properties_count}")
+        self.root_logger.info("New properties found: %d", new_properties_count)
+        self.root_logger.info("Properties removed: %d", removed_properties_count)
 
-    def log_email_sent(self, success: bool, recipients: List[str]) -> None:
+    def log_email_sent(self, success: bool, recipients: Union[str, List[str]]) -> None:
         """
         Log whether the email notification was successfully sent.
 
         Args:
             success: Whether the email was successfully sent
-            recipients: List of email recipients
+            recipients: List of email recipients, or an already joined string
         """
         if success:
             recipient_str = (
-                ", ".join(recipients) if isinstance(recipients, list) else recipients
+                recipients if isinstance(recipients, str) else ", ".join(recipients)
             )
             self.root_logger.info(
-                f"Email notification successfully sent to: {recipient_str}"
+                "Email notification successfully sent to: %s", recipient_str
             )
         else:
             self.root_logger.error("Failed to send email notification")
 
 
-# Function to get the singleton instance
+# Function to get the singleton instance. Named loggers are singletons themselves,
+# so the result is cached per name to skip the logging manager lookup and its lock
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     Get a named logger that uses the centralized configuration.
@@ -164,7 +211,9 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         A configured logger instance
     """
-    # Ensure LogService is initialized
-    LogService()
+    # Ensure LogService is initialized; after the first call this is a single flag
+    # check instead of constructing the singleton again
+    if not LogService._initialized:
+        LogService()
     # Get a named logger
     return logging.getLogger(name)
@@ -1,9 +1,10 @@
+import functools
+import html
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timezone
-from collections import defaultdict
-from datetime import datetime, timezone
+import string
+from email.message import EmailMessage
+from email.policy import SMTP
+from datetime import datetime
 from zoneinfo import ZoneInfo
 
 # Import the central logging service
@@ -12,6 +13,97 @@ from log_service import get_logger
 # Get logger for this module
 logger = get_logger("MailService")
 
+# Maximaal aantal berichten per SMTP-sessie; daarna wordt er opnieuw verbonden
+_MAX_MESSAGES_PER_CONNECTION = 100
+
+# De vaste opmaak van de nieuwe-woningen e-mail, zonder overbodige witruimte
+_CSS = (
+    "<style>"
+    "table{border-collapse:collapse;width:100%;margin-bottom:30px}"
+    "th,td{text-align:left;padding:8px;border-bottom:1px solid #ddd}"
+    "th{background-color:#f2f2f2}"
+    "tr:hover{background-color:#f5f5f5}"
+    ".price{color:#e63946;font-weight:bold}"
+    ".address{font-weight:bold}"
+    "h3{color:#2a6592;margin-top:30px;margin-bottom:10px}"
+    "</style>"
+)
+
+# De vaste delen van de e-mails worden eenmalig bij het importeren opgebouwd; per
+# e-mail worden alleen de variabele waarden ingevuld
+_TEMPLATES = {
+    "head": string.Template(
+        """
+            <html>
+            <head>"""
+        + _CSS
+        + """</head>
+            <body>
+                <h2>Nieuwe Huurwoningen</h2>
+                <p>Er zijn in totaal $total nieuwe huurwoningen gevonden bij $brokers makelaars:</p>
+            """
+    ),
+    "broker": string.Template("""
+                <h3>$broker_name ($count nieuwe woningen)</h3>
+                <table>
+                    <tr>
+                        <th>Adres</th>
+                        <th>Plaats</th>
+                        <th>Oppervlakte</th>
+                        <th>Huurprijs</th>
+                    </tr>
+                """),
+    "row": string.Template("""
+                    <tr>
+                        <td class="address"><a href="$link">$adres</a></td>
+                        <td>$plaats</td>
+                        <td>$oppervlakte</td>
+                        <td class="price">$prijs</td>
+                    </tr>
+                    """),
+    "foot": string.Template("""
+                <p>Dit bericht is automatisch gegenereerd door de HuurhuisWebscraper.</p>
+            </body>
+            </html>
+            """),
+    "error": string.Template("""
+            <html>
+            <body>
+                <h2>Er is een fout opgetreden in de HuurhuisWebscraper</h2>
+                <p><strong>Foutmelding:</strong> $error_message</p>
+                <p>Dit bericht is automatisch gegenereerd door de HuurhuisWebscraper.</p>
+            </body>
+            </html>
+            """),
+}
+
+
+# Gerenderde tabelrijen per combinatie van woningvelden, zodat een woning die opnieuw
+# verzonden wordt niet opnieuw ge-escaped en opgemaakt hoeft te worden. Alle
+# weergegeven velden vormen de sleutel, want de link alleen is niet uniek: scrapers
+# geven "N/A" terug voor woningen zonder link
+@functools.lru_cache(maxsize=1024)
+def _render_row(link, adres, plaats, oppervlakte, huurprijs):
+    """Render de tabelrij van een woning, met alle velden HTML-escaped.
+
+    Returns:
+        str: De <tr>-rij voor in de e-mail
+    """
+    # Format the price as "€ [price] p/m" if it's a number
+    if isinstance(huurprijs, (int, float)) and huurprijs > 0:
+        # Format with thousands separator (dot in Dutch format)
+        prijs = f"€ {huurprijs:,.0f}".replace(",", ".") + " p/m"
+    else:
+        prijs = "Onbekend"
+
+    return _TEMPLATES["row"].substitute(
+        link=html.escape(link),
+        adres=html.escape(str(adres)),
+        plaats=html.escape(str(plaats)),
+        oppervlakte=html.escape(str(oppervlakte)),
+        prijs=prijs,
+    )
+
 
 class MailService:
     """Service voor het versturen van e-mails met informatie over nieuwe woningen."""
@@ -36,6 +128,80 @@ class MailService:
         self.smtp_server = smtp_server or EMAIL["smtp_server"]
         self.smtp_port = smtp_port or EMAIL["smtp_port"]
 
+        # Eén geauthenticeerde SMTP-sessie wordt hergebruikt voor alle e-mails, zodat
+        # de TCP-, TLS- en login-handshake maar één keer nodig is
+        self._smtp = None
+        self._messages_on_connection = 0
+
+    def _get_connection(self):
+        """Geef een geauthenticeerde SMTP-verbinding terug, hergebruikt indien mogelijk.
+
+        Returns:
+            smtplib.SMTP: Een verbinding waarover direct verzonden kan worden
+        """
+        if self._smtp is not None:
+            if self._messages_on_connection < _MAX_MESSAGES_PER_CONNECTION:
+                # Controleer of de server de sessie nog open heeft
+                try:
+                    status, _ = self._smtp.noop()
+                except (smtplib.SMTPException, OSError):
+                    status = None
+                if status == 250:
+                    return self._smtp
+            self.close()
+
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.starttls()  # Beveilig de verbinding
+        server.login(self.sender_email, self.sender_password)
+
+        self._smtp = server
+        self._messages_on_connection = 0
+        return server
+
+    def _send(self, data, to_addrs):
+        """Verstuur een al geserialiseerd bericht over de hergebruikte SMTP-verbinding.
+
+        Args:
+            data: Het volledige bericht als bytes
+            to_addrs: De ontvangers van het bericht
+        """
+        server = self._get_connection()
+        try:
+            server.sendmail(self.sender_email, to_addrs, data)
+        except smtplib.SMTPServerDisconnected:
+            # De server heeft de sessie tussentijds gesloten; verbind één keer opnieuw
+            self.close()
+            server = self._get_connection()
+            server.sendmail(self.sender_email, to_addrs, data)
+        self._messages_on_connection += 1
+
+    def _send_to_each(self, msg, recipients):
+        """Verstuur hetzelfde bericht afzonderlijk naar elke ontvanger.
+
+        Zo ziet geen enkele ontvanger de adressen van de anderen, terwijl alle
+        berichten over dezelfde SMTP-sessie gaan. Het bericht wordt maar één keer
+        geserialiseerd; per ontvanger wordt alleen de To-header ervoor gezet.
+
+        Args:
+            msg: Het te versturen bericht, zonder To-header
+            recipients: Lijst van e-mailadressen
+        """
+        payload = msg.as_bytes(policy=SMTP)
+        for recipient in recipients:
+            self._send(SMTP.fold_binary("To", recipient) + payload, [recipient])
+
+    def close(self):
+        """Sluit de hergebruikte SMTP-verbinding, als die er is."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        finally:
+            self._smtp = None
+            self._messages_on_connection = 0
+
     def send_new_properties_email(self, recipients=None, nieuwe_properties=None):
         """Stuur een e-mail met nieuwe woningen.
 
@@ -66,11 +232,9 @@ class MailService:
 
         try:
             # Maak een nieuwe e-mail aan
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg["From"] = self.sender_email
-            msg["To"] = ", ".join(
-                recipients
-            )  # Meerdere ontvangers scheiden met komma's
+            # De To-header wordt per ontvanger ingevuld in _send_to_each
             msg["Subject"] = (
                 f"Nieuwe Huurwoningen - {datetime.now(ZoneInfo('Europe/Amsterdam')).strftime('%d-%m-%Y %H:%M')}"
             )
@@ -78,80 +242,36 @@ class MailService:
             # Groepeer properties per makelaar
             properties_by_broker = self._group_properties_by_broker(nieuwe_properties)
 
-            # Begin de HTML-inhoud
-            html_content = f"""
-            <html>
-            <head>
-                <style>
-                    table {{border-collapse: collapse; width: 100%; margin-bottom: 30px;}}
-                    th, td {{text-align: left; padding: 8px; border-bottom: 1px solid #ddd;}}
-                    th {{background-color: #f2f2f2;}}
-                    tr:hover {{background-color: #f5f5f5;}}
-                    .price {{color: #e63946; font-weight: bold;}}
-                    .address {{font-weight: bold;}}
-                    h3 {{color: #2a6592; margin-top: 30px; margin-bottom: 10px;}}
-                </style>
-            </head>
-            <body>
-                <h2>Nieuwe Huurwoningen</h2>
-                <p>Er zijn in totaal {len(nieuwe_properties)} nieuwe huurwoningen gevonden bij {len(properties_by_broker)} makelaars:</p>
-            """
+            # Verzamel de HTML-inhoud in delen en voeg ze aan het eind in één keer samen
+            parts = [
+                _TEMPLATES["head"].substitute(
+                    total=len(nieuwe_properties), brokers=len(properties_by_broker)
+                )
+            ]
 
             # Voor elke makelaar een aparte tabel maken
             for broker_name, properties in properties_by_broker.items():
-                html_content += f"""
-                <h3>{broker_name} ({len(properties)} nieuwe woningen)</h3>
-                <table>
-                    <tr>
-                        <th>Adres</th>
-                        <th>Plaats</th>
-                        <th>Oppervlakte</th>
-                        <th>Huurprijs</th>
-                    </tr>
-                """
+                parts.append(
+                    _TEMPLATES["broker"].substitute(
+                        broker_name=html.escape(broker_name), count=len(properties)
+                    )
+                )
 
                 # Voeg elke nieuwe woning van deze makelaar toe aan de tabel
-                for prop in properties:
-                    adres = prop.get("adres", "Onbekend")
-                    plaats = prop.get("naam_dorp_stad", "Onbekend")
-                    huurprijs = prop.get(
-                        "huurprijs", "Onbekend"
-                    )  # Format the price as "€ [price] p/m" if it's a number
-                    if isinstance(huurprijs, (int, float)) and huurprijs > 0:
-                        # Format with thousands separator (dot in Dutch format)
-                        prijs = f"€ {huurprijs:,.0f}".replace(",", ".") + " p/m"
-                    else:
-                        prijs = "Onbekend"
-                    oppervlakte = prop.get("oppervlakte", "Onbekend")
-                    link = prop.get("link", "#")
-
-                    html_content += f"""
-                    <tr>
-                        <td class="address"><a href="{link}">{adres}</a></td>
-                        <td>{plaats}</td>
-                        <td>{oppervlakte}</td>
-                        <td class="price">{prijs}</td>
-                    </tr>
-                    """
+                parts.extend(self._render_row(prop) for prop in properties)
 
                 # Sluit deze tabel
-                html_content += "</table>"
+                parts.append("</table>")
 
             # Sluit de HTML-inhoud af
-            html_content += """
-                <p>Dit bericht is automatisch gegenereerd door de HuurhuisWebscraper.</p>
-            </body>
-            </html>
-            """
+            parts.append(_TEMPLATES["foot"].substitute())
+            html_content = "".join(parts)
 
             # Voeg de HTML-inhoud toe aan de e-mail
-            msg.attach(MIMEText(html_content, "html"))
+            msg.set_content(html_content, subtype="html")
 
-            # Verbind met de SMTP-server en verstuur de e-mail
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Beveilig de verbinding
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            # Verstuur de e-mail naar elke ontvanger over de (hergebruikte) SMTP-verbinding
+            self._send_to_each(msg, recipients)
 
             return True
 
@@ -159,6 +279,23 @@ class MailService:
             logger.error(f"Fout bij het verzenden van de e-mail: {e}")
             return False
 
+    def _render_row(self, prop):
+        """Render de tabelrij van een woning, met alle velden HTML-escaped.
+
+        Args:
+            prop: De woning als dictionary
+
+        Returns:
+            str: De <tr>-rij voor in de e-mail
+        """
+        return _render_row(
+            prop.get("link", "#"),
+            prop.get("adres", "Onbekend"),
+            prop.get("naam_dorp_stad", "Onbekend"),
+            prop.get("oppervlakte", "Onbekend"),
+            prop.get("huurprijs", "Onbekend"),
+        )
+
     def _group_properties_by_broker(self, properties):
         """Groepeer properties per makelaar.
 
@@ -168,14 +305,17 @@ class MailService:
         Returns:
             Dictionary met properties gegroepeerd per makelaar
         """
-        result = defaultdict(list)
+        result = {}
 
         for prop in properties:
-            # Gebruik 'broker_naam' als dat beschikbaar is, anders gebruik makelaar_id
-            broker_name = prop.get(
-                "broker_naam", prop.get("makelaar_naam", "Onbekende makelaar")
+            # Gebruik 'broker_naam' als dat beschikbaar is, anders 'makelaar_naam'; de
+            # tweede lookup gebeurt alleen als de eerste niets oplevert
+            broker_name = (
+                prop.get("broker_naam")
+                or prop.get("makelaar_naam")
+                or "Onbekende makelaar"
             )
-            result[broker_name].append(prop)
+            result.setdefault(broker_name, []).append(prop)
 
         return result
 
@@ -201,31 +341,20 @@ class MailService:
             recipients = [recipients]
 
         try:
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg["From"] = self.sender_email
-            msg["To"] = ", ".join(
-                recipients
-            )  # Meerdere ontvangers scheiden met komma's
+            # De To-header wordt per ontvanger ingevuld in _send_to_each
             msg["Subject"] = (
                 f"Fout in HuurhuisWebscraper - {datetime.now().strftime('%d-%m-%Y %H:%M')}"
             )
 
-            html_content = f"""
-            <html>
-            <body>
-                <h2>Er is een fout opgetreden in de HuurhuisWebscraper</h2>
-                <p><strong>Foutmelding:</strong> {error_message}</p>
-                <p>Dit bericht is automatisch gegenereerd door de HuurhuisWebscraper.</p>
-            </body>
-            </html>
-            """
+            html_content = _TEMPLATES["error"].substitute(
+                error_message=html.escape(str(error_message))
+            )
 
-            msg.attach(MIMEText(html_content, "html"))
+            msg.set_content(html_content, subtype="html")
 
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            self._send_to_each(msg, recipients)
 
             logger.info(
                 f"Foutmelding e-mail verzonden naar {len(recipients)} ontvanger(s)."
@@ -1,27 +1,40 @@
 """
 HuurhuisWebscraper package for scraping rental property listings.
+
+The scraper classes are imported lazily on first access (PEP 562), so importing a
+single submodule such as scrapers.base_scraper doesn't load every scraper.
 """
 
-from scrapers.base_scraper import BaseScraper
-from scrapers.ditters_scraper import DittersScraper
-from scrapers.interhouse_scraper import InterHouseScraper
-from scrapers.nederwoon_scraper import NederwoonScraper
-from scrapers.pararius_scraper import ParariusScraper
-from scrapers.scraper_factory import ScraperFactory
-from scrapers.vastgoednederland_scraper import VastgoedNederlandScraper
-from scrapers.vbt_scraper import VBTScraper
-from scrapers.vdbunt_scraper import VdBuntScraper
-from scrapers.zonnenberg_scraper import ZonnenbergScraper
-
-__all__ = [
-    "BaseScraper",
-    "VdBuntScraper",
-    "ParariusScraper",
-    "ZonnenbergScraper",
-    "DittersScraper",
-    "InterHouseScraper",
-    "NederwoonScraper",
-    "VastgoedNederlandScraper",
-    "VBTScraper",
-    "ScraperFactory",
-]
+import importlib
+
+# Public name -> module that defines it
+_EXPORTS = {
+    "BaseScraper": "scrapers.base_scraper",
+    "VdBuntScraper": "scrapers.vdbunt_scraper",
+    "ParariusScraper": "scrapers.pararius_scraper",
+    "ZonnenbergScraper": "scrapers.zonnenberg_scraper",
+    "DittersScraper": "scrapers.ditters_scraper",
+    "InterHouseScraper": "scrapers.interhouse_scraper",
+    "NederwoonScraper": "scrapers.nederwoon_scraper",
+    "VastgoedNederlandScraper": "scrapers.vastgoednederland_scraper",
+    "VBTScraper": "scrapers.vbt_scraper",
+    "ScraperFactory": "scrapers.scraper_factory",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import a scraper class the first time it is accessed on the package."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache on the package so later lookups don't go through __getattr__ again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the lazily available names next to the regular module attributes."""
+    return sorted(set(globals()) | set(__all__))
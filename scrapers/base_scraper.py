@@ -2,15 +2,23 @@
 Base scraper module that defines the abstract base class for all website scrapers.
 """
 
+import atexit
+import functools
 import logging
 import re
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
+import lxml.html
 import requests
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from requests.adapters import HTTPAdapter
 
 try:
     from bs4 import BeautifulSoup
+    from bs4.dammit import EncodingDetector
 except ImportError as exc:
     raise ImportError(
         "BeautifulSoup4 is required. Install it using 'pip install beautifulsoup4'"
@@ -18,14 +26,106 @@ except ImportError as exc:
 
 # Import the central logging service
 from log_service import get_logger
+from utils import normalize_price
 
 # Get logger for this module
 logger = get_logger("WebScraper")
 
+# One HTTP session shared by all scrapers, so TCP/TLS connections to a site are
+# kept alive between pages instead of being set up again for every request
+_HTTP = requests.Session()
+# The broker threads share this session: keep a connection pool per site for every
+# scraped host and allow enough connections per host for concurrent page fetches
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+atexit.register(_HTTP.close)
+
+# Pattern compiled once at import instead of on every call
+_PRICE_RE = re.compile(r"(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?|\d+)")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_rental_price(price_text: str) -> Optional[int]:
+    """Parse a rental price text to whole euros.
+
+    This is a pure function of the text, so results are cached: the same price
+    strings come back on every page and every run.
+
+    Args:
+        price_text: The text containing the rental price (e.g., "€ 1.250,- per maand")
+
+    Returns:
+        The rental price in whole euros, or None if no amount was found.
+    """
+    # Fast path for prices that are already just digits, e.g. "1250"
+    if price_text.isdecimal():
+        return int(price_text)
+
+    # Remove all non-numeric characters except for decimals and thousands separators
+    # Extract the first number sequence that could represent an amount
+    matches = _PRICE_RE.search(price_text)
+    if not matches:
+        return None
+    # Get the matched price
+    price_str = matches.group(1)
+
+    # Check if the price has a decimal part (after the last comma or dot)
+    if "," in price_str or "." in price_str:
+        # In Dutch format, commas are used as decimal separators
+        # Replace dots as thousands separators first
+        price_str = price_str.replace(".", "")
+
+        # If there's a comma, it's likely a decimal separator
+        if "," in price_str:
+            # Replace comma with dot (standard decimal in Python)
+            parts = price_str.split(",")
+            if len(parts) > 1 and len(parts[1]) <= 2:  # If it's cents (1 or 2 digits)
+                # Handle as decimal
+                price_str = parts[0] + "." + parts[1]
+            else:
+                # Treat as thousand separator
+                price_str = price_str.replace(",", "")
+
+        # Convert to float first to handle decimals, then to int to get whole euros
+        return int(float(price_str))
+    else:
+        # No decimal part, just remove any remaining non-numeric characters
+        price_str = price_str.replace(".", "").replace(",", "")
+        return int(price_str)
+
+
+def first_text(element: lxml.html.HtmlElement, selector: CSSSelector) -> Optional[str]:
+    """Return the text of the first match of a compiled selector below an element.
+
+    This is the lxml tree counterpart of BeautifulSoup's select_one(...).text.
+
+    Args:
+        element: The element to search in.
+        selector: The compiled CSS selector.
+
+    Returns:
+        The text content of the first match, or None if nothing matches.
+    """
+    matches = selector(element)
+    return matches[0].text_content() if matches else None
+
 
 class BaseScraper(ABC):
     """Abstract base class for web scraping real estate websites."""
 
+    # Number of listing pages fetched concurrently by get_all_listings. Scrapers that
+    # can't fetch pages in parallel (e.g. a single Selenium driver) set this to 1
+    PAGE_FETCH_WORKERS = 3
+
+    # Request headers, shared read-only by all instances; subclasses that need other
+    # headers override this class attribute instead of building a dict per instance
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        # Ask for compressed HTML; requests decompresses it transparently
+        "Accept-Encoding": "gzip, deflate",
+    }
+
     def __init__(self, base_url: str):
         """Initialize with the base URL of the real estate website.
 
@@ -33,11 +133,10 @@ class BaseScraper(ABC):
             base_url: The base URL of the real estate website.
         """
         self.base_url = base_url
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        self.headers = self.HEADERS
         # Get a logger for the specific scraper instance
         self.logger = get_logger(self.__class__.__name__)
+        self.session = _HTTP
 
     def get_page_content(self, url: str) -> Optional[BeautifulSoup]:
         """Retrieve the HTML content of a page.
@@ -48,14 +147,81 @@ class BaseScraper(ABC):
         Returns:
             BeautifulSoup object with the HTML content, or None if an error occurs.
         """
+        response = self._fetch(url)
+        if response is None:
+            return None
+        return self.parse_response(response)
+
+    def get_page_tree(self, url: str) -> Optional[lxml.html.HtmlElement]:
+        """Retrieve a page as an lxml element tree.
+
+        This is the fast path for listing pages: selectors compiled with
+        lxml.cssselect.CSSSelector (or XPath) are matched in C by libxml2, instead
+        of by BeautifulSoup's Python-level tree navigation.
+
+        Args:
+            url: The URL to retrieve.
+
+        Returns:
+            The root element of the parsed page, or None if an error occurs.
+        """
+        response = self._fetch(url)
+        if response is None:
+            return None
+
+        # Same encoding rule as parse_response: only trust a declared charset
+        content_type = response.headers.get("Content-Type", "").lower()
+        if "charset=" in content_type:
+            parser = lxml.html.HTMLParser(encoding=response.encoding)
+        elif EncodingDetector.find_declared_encoding(response.content, is_html=True):
+            # Let libxml2 use the document's own <meta charset>
+            parser = None
+        else:
+            # Without any declaration libxml2 assumes Latin-1; BeautifulSoup tried
+            # UTF-8 first, which is what these sites serve
+            parser = lxml.html.HTMLParser(encoding="utf-8")
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            return lxml.html.fromstring(response.content, base_url=url, parser=parser)
+        except etree.ParserError as e:
+            self.logger.error("Error parsing %s: %s", url, e)
+            return None
+
+    def _fetch(self, url: str) -> Optional[requests.Response]:
+        """Perform a GET request for a page with the scraper's headers.
+
+        Args:
+            url: The URL to retrieve.
+
+        Returns:
+            The successful response, or None if an error occurs.
+        """
+        try:
+            response = self.session.get(url, headers=self.headers, timeout=15)
             response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
+            return response
         except requests.exceptions.RequestException as e:
             self.logger.error("Error retrieving %s: %s", url, e)
             return None
 
+    @staticmethod
+    def parse_response(response: requests.Response) -> BeautifulSoup:
+        """Parse the raw bytes of a response with lxml.
+
+        Passing bytes skips decoding the whole document to a str first (and the
+        encoding detection of response.text); the parser decodes it itself.
+
+        Args:
+            response: The HTTP response to parse.
+
+        Returns:
+            BeautifulSoup object with the HTML content.
+        """
+        # Only pass on the encoding when the server declared one; otherwise requests
+        # falls back to ISO-8859-1 and the document's own <meta charset> should win
+        content_type = response.headers.get("Content-Type", "").lower()
+        encoding = response.encoding if "charset=" in content_type else None
+        return BeautifulSoup(response.content, "lxml", from_encoding=encoding)
+
     def clean_text(self, text: str) -> str:
         """Clean text by removing whitespace.
 
@@ -67,7 +233,9 @@ class BaseScraper(ABC):
         """
         if text is None:
             return "N/A"
-        return re.sub(r"\s+", " ", text).strip() or "N/A"
+        # str.split() without arguments splits on every (unicode) whitespace run, incl.
+        # non-breaking spaces, and drops leading/trailing whitespace in the same pass
+        return " ".join(text.split()) or "N/A"
 
     def extract_rental_price(self, price_text: str) -> int:
         """Extract numeric rental price from text.
@@ -82,49 +250,18 @@ class BaseScraper(ABC):
             return 0
 
         try:
-            # Remove all non-numeric characters except for decimals and thousands separators
-            # Extract the first number sequence that could represent an amount
-            matches = re.search(
-                r"(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?|\d+)", price_text
-            )
-            if not matches:
-                self.logger.warning(
-                    "Could not extract rental price from: %s", price_text
-                )
-                return 0  # Get the matched price
-            price_str = matches.group(1)
-
-            # Check if the price has a decimal part (after the last comma or dot)
-            if "," in price_str or "." in price_str:
-                # In Dutch format, commas are used as decimal separators
-                # Replace dots as thousands separators first
-                price_str = price_str.replace(".", "")
-
-                # If there's a comma, it's likely a decimal separator
-                if "," in price_str:
-                    # Replace comma with dot (standard decimal in Python)
-                    parts = price_str.split(",")
-                    if (
-                        len(parts) > 1 and len(parts[1]) <= 2
-                    ):  # If it's cents (1 or 2 digits)
-                        # Handle as decimal
-                        price_str = parts[0] + "." + parts[1]
-                    else:
-                        # Treat as thousand separator
-                        price_str = price_str.replace(",", "")
-
-                # Convert to float first to handle decimals, then to int to get whole euros
-                return int(float(price_str))
-            else:
-                # No decimal part, just remove any remaining non-numeric characters
-                price_str = price_str.replace(".", "").replace(",", "")
-                return int(price_str)
+            price = _parse_rental_price(price_text)
         except (ValueError, AttributeError) as e:
             self.logger.error(
                 "Error extracting rental price from '%s': %s", price_text, e
             )
             return 0
 
+        if price is None:
+            self.logger.warning("Could not extract rental price from: %s", price_text)
+            return 0
+        return price
+
     @abstractmethod
     def get_property_listings(self, page_num: int = 1) -> List[Dict[str, str]]:
         """Retrieve the properties of all rental properties from a page.
@@ -149,11 +286,14 @@ class BaseScraper(ABC):
         """
         # Abstract method doesn't need a pass statement
 
-    def get_all_listings(self, max_pages: int = 5) -> List[Dict[str, str]]:
+    def get_all_listings(
+        self, max_pages: int = 5, max_price: Optional[int] = None
+    ) -> List[Dict[str, str]]:
         """Retrieve all rental properties up to a maximum number of pages.
 
         Args:
             max_pages: Maximum number of pages to retrieve.
+            max_price: Skip properties with a known rental price above this value.
 
         Returns:
             List of all found rental properties.
@@ -162,33 +302,93 @@ class BaseScraper(ABC):
         # Set to keep track of addresses we've already seen to prevent duplicates
         seen_addresses = set()
 
-        for page in range(1, max_pages + 1):
-            try:
-                page_listings = self.get_property_listings(page)
-                if not page_listings:
-                    break
-
-                # Check for duplicate listings by address
-                unique_listings = []
-                duplicate_count = 0
-
-                for listing in page_listings:
-                    address = listing.get("adres", "")
-                    if address and address not in seen_addresses:
-                        seen_addresses.add(address)
-                        unique_listings.append(listing)
-                    else:
-                        duplicate_count += 1
+        # Fetch the next pages ahead while the current one is processed. Pages are still
+        # handled in order, so stopping on an empty or duplicate page works exactly like
+        # a serial walk. The walk starts with page 1 alone and only fetches further ahead
+        # (up to the window) after full pages, so small brokers don't get speculative
+        # requests for pages that don't exist
+        window = max(1, min(self.PAGE_FETCH_WORKERS, max_pages))
+        executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix="page")
+        pending = {1: executor.submit(self.get_property_listings, 1)}
+        # Number of listings on the first page, i.e. on a full page
+        full_page_size = None
 
-                # If all listings on this page are duplicates, stop scraping
-                if duplicate_count == len(page_listings):
+        try:
+            for page in range(1, max_pages + 1):
+                try:
+                    page_listings = pending.pop(page).result()
+                    if not page_listings:
+                        break
+
+                    # Check for duplicate listings by address with one set difference
+                    new_addresses = {
+                        listing.get("adres") for listing in page_listings
+                    } - seen_addresses
+                    new_addresses.discard("")
+                    new_addresses.discard(None)
+
+                    # If all listings on this page are duplicates, stop scraping
+                    if not new_addresses:
+                        break
+                    seen_addresses |= new_addresses
+
+                    unique_listings = []
+                    for listing in page_listings:
+                        address = listing.get("adres")
+                        if address in new_addresses:
+                            # Only the first listing with an address is kept
+                            new_addresses.remove(address)
+                            # Store the price as an int so it can be compared and hashed directly
+                            listing["huurprijs"] = normalize_price(
+                                listing.get("huurprijs")
+                            )
+                            unique_listings.append(listing)
+
+                    # Drop listings above the maximum price before they are collected;
+                    # listings without a known price are kept
+                    if max_price is not None:
+                        unique_listings = [
+                            listing
+                            for listing in unique_listings
+                            if self._within_max_price(listing, max_price)
+                        ]
+
+                    # Add only unique listings to our results
+                    all_listings.extend(unique_listings)
+
+                    # Grow the look-ahead by one page per full page. A short page is
+                    # probably the last one, so then only the next page is requested
+                    if full_page_size is None:
+                        full_page_size = len(page_listings)
+                    ahead = (
+                        min(window, page) if len(page_listings) >= full_page_size else 1
+                    )
+                    for next_page in range(page + 1, min(page + ahead, max_pages) + 1):
+                        if next_page not in pending:
+                            pending[next_page] = executor.submit(
+                                self.get_property_listings, next_page
+                            )
+
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    self.logger.error("Error processing page %d: %s", page, e)
                     break
+        finally:
+            # Pages fetched ahead beyond the last one are not needed anymore: cancel the
+            # ones that haven't started and let the running ones finish before returning
+            executor.shutdown(wait=True, cancel_futures=True)
 
-                # Add only unique listings to our results
-                all_listings.extend(unique_listings)
+        return all_listings
 
-            except (requests.RequestException, ValueError, KeyError) as e:
-                self.logger.error("Error processing page %d: %s", page, e)
-                break
+    @staticmethod
+    def _within_max_price(listing: Dict[str, str], max_price: int) -> bool:
+        """Check whether a listing's rental price is unknown or within the maximum.
 
-        return all_listings
+        Args:
+            listing: The listing to check, with a price normalized by normalize_price.
+            max_price: The maximum rental price.
+
+        Returns:
+            True if the price is unknown or at most max_price, otherwise False.
+        """
+        price = listing.get("huurprijs")
+        return price is None or price <= max_price
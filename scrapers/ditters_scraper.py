@@ -7,31 +7,53 @@ import re
 from typing import Dict, List
 from urllib.parse import urljoin
 
-from scrapers.base_scraper import BaseScraper
+import soupsieve as sv
+from lxml.cssselect import CSSSelector
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError as exc:
-    raise ImportError(
-        "BeautifulSoup4 is required. Install it using 'pip install beautifulsoup4'"
-    ) from exc
+from scrapers.base_scraper import BaseScraper, first_text
 
 # Get logger for this module
 logger = logging.getLogger("WebScraper")
 
+# Listing page selectors, translated to XPath once at import and matched by libxml2
+_ITEM_SEL = CSSSelector("div.aanbod-list__inner.product-starters-template-row-link")
+_ITEM_FALLBACK_SEL = CSSSelector('div[class*="template-row-link"]')
+_LINK_SEL = CSSSelector("a")
+_TITLE_SEL = CSSSelector("h4.title")
+_CITY_SEL = CSSSelector("span.city")
+_LOCATION_SEL = CSSSelector("div.UITextArea.element-content span")
+_PRICE_SEL = CSSSelector("div.UILabelPrice.element-content span")
+_METADATA_SEL = CSSSelector("div.metadata-item span")
+
+# Detail page selectors for BeautifulSoup, parsed once by soupsieve instead of on
+# every select() call
+_DETAIL_ADDRESS_SEL = sv.compile("h1.title, h1.property-title, h3.title")
+_DETAIL_CITY_SEL = sv.compile("span.city, div.city span")
+_DETAIL_PRICE_SEL = sv.compile("span.price, div.price span, div.UILabelPrice span")
+_DETAIL_AREA_SEL = sv.compile(
+    "div.metadata-item span, div.specifications div, div.kenmerk"
+)
+_DETAIL_AREA_FALLBACK_SEL = sv.compile(
+    'span:-soup-contains("m²", "m2"), div:-soup-contains("m²", "m2")'
+)
+
+# Area pattern, compiled once at import instead of per element
+_AREA_RE = re.compile(r"(\d+)\s*(?:m²|m2)")
+
 
 class DittersScraper(BaseScraper):
     """Scraper specifically for the Ditters website."""
 
+    # Add extended headers to mimic a real browser
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "nl,en-US;q=0.7,en;q=0.3",
+    }
+
     def __init__(self):
         """Initialize the Ditters scraper."""
         super().__init__("https://www.ditters.nl")
-        # Add extended headers to mimic a real browser
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "nl,en-US;q=0.7,en;q=0.3",
-        }
 
     def get_property_listings(self, page_num: int = 1) -> List[Dict[str, str]]:
         """Retrieve rental properties from the Ditters website.
@@ -48,21 +70,19 @@ class DittersScraper(BaseScraper):
         else:
             url = f"{self.base_url}/woningaanbod/?filter%5Bcategory%5D=%2FHuur"
 
-        soup = self.get_page_content(url)
-        if not soup:
+        tree = self.get_page_tree(url)
+        if tree is None:
             logger.error("Failed to get content from %s", url)
             return []
 
         listings = []
 
         # Look for property items
-        property_items = soup.select(
-            "div.aanbod-list__inner.product-starters-template-row-link"
-        )
+        property_items = _ITEM_SEL(tree)
 
         if not property_items:
             # Try alternative selector patterns if the primary one doesn't work
-            property_items = soup.select('div[class*="template-row-link"]')
+            property_items = _ITEM_FALLBACK_SEL(tree)
 
         for item in property_items:
             try:
@@ -81,20 +101,20 @@ class DittersScraper(BaseScraper):
 
                 # If not found, try to find it in a nested element
                 if not property_url:
-                    link_element = item.find("a")
-                    if link_element:
-                        property_url = link_element.get("href")
+                    link_elements = _LINK_SEL(item)
+                    if link_elements:
+                        property_url = link_elements[0].get("href")
 
                 # If still no URL, the page might use JavaScript for navigation
                 # Try to construct the URL based on the available data
                 if not property_url:
                     # Look for any data that might help construct the URL
-                    address_element = item.select_one("h4.title")
-                    city_element = item.select_one("span.city")
+                    address_text = first_text(item, _TITLE_SEL)
+                    city_text = first_text(item, _CITY_SEL)
 
-                    if address_element and city_element:
-                        address_text = self.clean_text(address_element.text)
-                        city_text = self.clean_text(city_element.text)
+                    if address_text is not None and city_text is not None:
+                        address_text = self.clean_text(address_text)
+                        city_text = self.clean_text(city_text)
 
                         # Construct URL from city and address
                         slug = f"{city_text.lower()}-{address_text.lower().replace(' ', '-')}"
@@ -107,25 +127,26 @@ class DittersScraper(BaseScraper):
                 property_data["link"] = property_url if property_url else "N/A"
 
                 # Extract address
-                address_element = item.select_one("h4.title")
-                if address_element:
-                    property_data["adres"] = self.clean_text(address_element.text)
+                address_text = first_text(item, _TITLE_SEL)
+                if address_text is not None:
+                    property_data["adres"] = self.clean_text(address_text)
 
                 # Extract location/city
-                city_element = item.select_one("div.UITextArea.element-content span")
-                if city_element:
-                    property_data["naam_dorp_stad"] = self.clean_text(
-                        city_element.text
-                    )  # Extract price
-                price_element = item.select_one("div.UILabelPrice.element-content span")
-                if price_element:
-                    price_text = self.clean_text(price_element.text)
+                city_text = first_text(item, _LOCATION_SEL)
+                if city_text is not None:
+                    property_data["naam_dorp_stad"] = self.clean_text(city_text)
+
+                # Extract price
+                price_text = first_text(item, _PRICE_SEL)
+                if price_text is not None:
+                    price_text = self.clean_text(price_text)
                     property_data["huurprijs"] = self.extract_rental_price(price_text)
 
                 # Find all size/area related elements
-                area_elements = item.select("div.metadata-item span")
+                area_elements = _METADATA_SEL(item)
                 for element in area_elements:
-                    text = self.clean_text(element.text)
+                    text = self.clean_text(element.text_content())
+                    # Two substring tests beat a regex search on these short texts
                     if "m²" in text or "m2" in text:
                         property_data["oppervlakte"] = text
                         break
@@ -169,48 +190,43 @@ class DittersScraper(BaseScraper):
 
         try:
             # Extract address from detail page
-            address_element = soup.select_one("h1.title, h1.property-title, h3.title")
+            address_element = _DETAIL_ADDRESS_SEL.select_one(soup)
             if address_element:
                 details["adres"] = self.clean_text(address_element.text)
 
             # Extract city/location
-            city_element = soup.select_one("span.city, div.city span")
+            city_element = _DETAIL_CITY_SEL.select_one(soup)
             if city_element:
                 details["naam_dorp_stad"] = self.clean_text(
                     city_element.text
                 )  # Extract price
-            price_element = soup.select_one(
-                "span.price, div.price span, div.UILabelPrice span"
-            )
+            price_element = _DETAIL_PRICE_SEL.select_one(soup)
             if price_element:
-                price_text = self.clean_text(price_element.text)
+                # The price is only parsed for its number, so stripping the text pieces
+                # in the same pass is enough; no separate whitespace cleanup
+                price_text = price_element.get_text(" ", strip=True)
                 details["huurprijs"] = self.extract_rental_price(price_text)
 
             # Extract area - look for elements containing m²
-            for element in soup.select(
-                "div.metadata-item span, div.specifications div, div.kenmerk"
-            ):
+            for element in _DETAIL_AREA_SEL.select(soup):
                 text = self.clean_text(element.text)
-                if "m²" in text or "m2" in text:
-                    # Check if it's specifically about living area
-                    if (
-                        "woonoppervlakte" in text.lower()
-                        or "oppervlakte" in text.lower()
-                    ):
-                        area_match = re.search(r"(\d+)\s*(?:m²|m2)", text)
-                        if area_match:
-                            details["oppervlakte"] = f"{area_match.group(1)}m²"
-                            break
-
-            # If we still don't have an area, take the first element that contains m²
+                # One regex pass both finds the m² value and extracts its number
+                area_match = _AREA_RE.search(text)
+                # Check if it's specifically about living area ("woonoppervlakte"
+                # contains "oppervlakte")
+                if area_match and "oppervlakte" in text.lower():
+                    details["oppervlakte"] = f"{area_match.group(1)}m²"
+                    break
+
+            # If we still don't have an area, take the first element that contains m².
+            # The text filter runs inside the selector, so only candidates are cleaned
             if details["oppervlakte"] == "N/A":
-                for element in soup.select("span, div"):
+                for element in _DETAIL_AREA_FALLBACK_SEL.select(soup):
                     text = self.clean_text(element.text)
-                    if "m²" in text or "m2" in text:
-                        area_match = re.search(r"(\d+)\s*(?:m²|m2)", text)
-                        if area_match:
-                            details["oppervlakte"] = f"{area_match.group(1)}m²"
-                            break
+                    area_match = _AREA_RE.search(text)
+                    if area_match:
+                        details["oppervlakte"] = f"{area_match.group(1)}m²"
+                        break
 
         except (AttributeError, TypeError) as e:
             logger.error("Error retrieving details from %s: %s", property_url, e)
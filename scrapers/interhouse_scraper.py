@@ -8,14 +8,20 @@ import time
 from typing import Dict, List, Optional, Union
 from urllib.parse import urljoin, parse_qs, urlparse
 
+import lxml.html
+import soupsieve as sv
 from bs4 import BeautifulSoup
-from scrapers.base_scraper import BaseScraper
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+from scrapers.base_scraper import BaseScraper, first_text
 
 # Import our Selenium helper module
 from scrapers.selenium_helper import create_chrome_driver, quit_driver
 
 # Import Selenium components
 try:
+    from selenium.common.exceptions import WebDriverException
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.webdriver.support.ui import WebDriverWait
@@ -30,10 +36,65 @@ from log_service import get_logger
 # Get logger for this module
 logger = get_logger("WebScraper")
 
+# Listing page selectors, translated to XPath once at import and matched by libxml2
+_ITEM_SEL = CSSSelector("div.c-result-item.building-result")
+_ADDRESS_SEL = CSSSelector("span.c-result-item__title-address")
+_LOCATION_SEL = CSSSelector("p.c-result-item__location-label")
+_PRICE_SEL = CSSSelector("p.c-result-item__price-label")
+# Value of the "Woonoppervlakte" row of the data table, found in one XPath query
+_AREA_VALUE_XPATH = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' c-result-item__data-table-item ')]"
+    "[.//p[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' c-result-item__data-header ')][contains(., 'Woonoppervlakte')]]"
+    "//p[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' c-result-item__data-value ')]"
+)
+_BUTTON_LINK_SEL = CSSSelector("div.c-result-item__button-wrapper a")
+_BUTTON_SEL = CSSSelector("a.c-button")
+_ANY_LINK_SEL = CSSSelector("a")
+
+# Detail page selectors for BeautifulSoup, parsed once by soupsieve instead of on
+# every select() call
+_DETAIL_ADDRESS_SEL = sv.compile("h1.c-listing-heading__address-part")
+_DETAIL_LOCATION_SEL = sv.compile("p.c-listing-heading__location-label")
+_DETAIL_PRICE_SEL = sv.compile("p.c-listing-heading__price-label")
+_SPECS_ITEM_SEL = sv.compile("div.c-listing-specs div.c-listing-specs__item")
+_SPECS_LABEL_SEL = sv.compile("p.c-listing-specs__label")
+_SPECS_VALUE_SEL = sv.compile("p.c-listing-specs__value")
+_DETAIL_AREA_FALLBACK_SEL = sv.compile(
+    'p:-soup-contains("m²", "m2"), div:-soup-contains("m²", "m2"), '
+    'span:-soup-contains("m²", "m2")'
+)
+
+# Area patterns, compiled once at import instead of per element
+_AREA_RE = re.compile(r"(\d+)\s*(?:m²|m2)")
+_SUP_RE = re.compile(r"m</?sup>2</sup>")
+
+# Returns the outerHTML of all elements matching the selector passed as argument
+_OUTER_HTML_JS = (
+    "return Array.from(document.querySelectorAll(arguments[0]),"
+    " el => el.outerHTML).join('');"
+)
+
+if SELENIUM_AVAILABLE:
+    # A page is loaded once it shows results or the "no results" message. Built once
+    # and reused for every page instead of creating the conditions on each poll
+    _PAGE_LOADED = EC.any_of(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "div.c-result-item")),
+        EC.text_to_be_present_in_element(
+            (By.ID, "building-search-results"),
+            "Er zijn helaas geen resultaten gevonden",
+        ),
+    )
+
 
 class InterHouseScraper(BaseScraper):
     """Scraper specifically for the InterHouse website which uses JavaScript for content loading."""
 
+    # All pages are loaded through the same Selenium driver, one at a time
+    PAGE_FETCH_WORKERS = 1
+
     # Define supported locations
     LOCATIONS = {"Utrecht": "Utrecht_Algemeen", "Amersfoort": "Amersfoort_Algemeen"}
 
@@ -76,6 +137,9 @@ class InterHouseScraper(BaseScraper):
 
                 if self.driver is None:
                     self.logger.error("Failed to create Chrome WebDriver using helper")
+                else:
+                    # Only the explicit WebDriverWait below may block on elements
+                    self.driver.implicitly_wait(0)
 
             except Exception as e:
                 self.logger.error(f"Error initializing Selenium WebDriver: {e}")
@@ -92,23 +156,29 @@ class InterHouseScraper(BaseScraper):
             except Exception as e:
                 self.logger.error(f"Error quitting WebDriver: {e}")
 
-    def get_page_content(self, url: str) -> Optional[BeautifulSoup]:
-        """Override the get_page_content method to use Selenium for JavaScript rendering.
+    def __del__(self):
+        """Quit a WebDriver that is still running when the scraper is discarded."""
+        # The attribute is missing if __init__ didn't get that far
+        if getattr(self, "driver", None) is not None:
+            self._quit_driver()
+
+    def _load_page(self, url: str) -> bool:
+        """Load a page in Selenium so its JavaScript content is rendered.
 
         Args:
             url: The URL to retrieve.
 
         Returns:
-            BeautifulSoup object with the rendered HTML content, or None if an error occurs.
+            True if the page is loaded in the driver, False if the caller should fall
+            back to a plain request.
         """
-
         # If Selenium is not available, fall back to the base method
         if not SELENIUM_AVAILABLE:
             self.logger.warning(
                 "Falling back to requests as Selenium is not installed. "
                 "This may result in incomplete data."
             )
-            return super().get_page_content(url)
+            return False
 
         try:
             # Set up the driver if needed
@@ -119,34 +189,79 @@ class InterHouseScraper(BaseScraper):
                 self.logger.warning(
                     "WebDriver setup failed. Falling back to requests method."
                 )
-                return super().get_page_content(url)
+                return False
 
             # Navigate to the URL
             self.driver.get(url)
 
             # Wait for the page to load (wait for some expected element)
             try:
-                WebDriverWait(self.driver, 10).until(
-                    lambda driver: (
-                        driver.find_elements(By.CSS_SELECTOR, "div.c-result-item")
-                        or EC.text_to_be_present_in_element(
-                            (By.ID, "building-search-results"),
-                            "Er zijn helaas geen resultaten gevonden",
-                        )(driver)
-                    )
-                )
+                WebDriverWait(self.driver, 10).until(_PAGE_LOADED)
             except Exception as e:
                 self.logger.warning(f"Timeout waiting for page elements: {e}")
                 # Continue anyway as the page might still have loaded partially
 
-            # Get the page content
-            content = self.driver.page_source
-
-            return BeautifulSoup(content, "html.parser")
+            return True
         except Exception as e:
             self.logger.error("Error retrieving %s with Selenium: %s", url, e)
             # As a fallback, try the regular requests method
+            return False
+
+    def _render_page(self, url: str) -> Optional[str]:
+        """Render a page in Selenium and return its HTML.
+
+        Args:
+            url: The URL to retrieve.
+
+        Returns:
+            The rendered HTML, or None if the caller should fall back to a plain request.
+        """
+        if not self._load_page(url):
+            return None
+        try:
+            # Get the page content
+            return self.driver.page_source
+        except WebDriverException as e:
+            self.logger.error("Error reading %s from WebDriver: %s", url, e)
+            return None
+
+    def get_page_content(self, url: str) -> Optional[BeautifulSoup]:
+        """Override the get_page_content method to use Selenium for JavaScript rendering.
+
+        Args:
+            url: The URL to retrieve.
+
+        Returns:
+            BeautifulSoup object with the rendered HTML content, or None if an error occurs.
+        """
+        content = self._render_page(url)
+        if content is None:
             return super().get_page_content(url)
+        return BeautifulSoup(content, "lxml")
+
+    def _render_results(self, url: str) -> Optional[lxml.html.HtmlElement]:
+        """Render a listing page in Selenium and parse only its result items.
+
+        Args:
+            url: The URL of the listing page.
+
+        Returns:
+            An element containing the result items, or None if rendering fails; the
+            caller already has the plain request result to fall back on.
+        """
+        if not self._load_page(url):
+            return None
+        try:
+            # One script call copies only the result items out of Chrome, instead of
+            # serializing the whole page with page_source
+            content = self.driver.execute_script(
+                _OUTER_HTML_JS, "div.c-result-item.building-result"
+            )
+            # The items are siblings without a root, so wrap them in a single <div>
+            return lxml.html.fragment_fromstring(content, create_parent="div")
+        except (WebDriverException, etree.ParserError) as e:
+            self.logger.error("Error reading the results of %s: %s", url, e)
+            return None
 
     def get_property_listings(self, page_num: int = 1) -> List[Dict[str, str]]:
         """Retrieve rental properties from the InterHouse website.
@@ -166,16 +281,24 @@ class InterHouseScraper(BaseScraper):
         else:
             url = f"{base_search_url}{params}"
 
-        soup = self.get_page_content(url)
-        if not soup:
+        # Use the server-rendered HTML when it already contains the results, and only
+        # render the page in Selenium (Chrome start, JS, wait) when it doesn't
+        tree = self.get_page_tree(url)
+        property_items = _ITEM_SEL(tree) if tree is not None else []
+        if not property_items and SELENIUM_AVAILABLE:
+            rendered = self._render_results(url)
+            # If rendering fails, keep the plain request result
+            if rendered is not None:
+                tree = rendered
+                # Find all property items
+                property_items = _ITEM_SEL(tree)
+
+        if tree is None:
             self.logger.error("Failed to get content from %s", url)
             return []
 
         listings = []
 
-        # Find all property items
-        property_items = soup.select("div.c-result-item.building-result")
-
         for item in property_items:
             try:
                 # Initialize property data with default values
@@ -188,55 +311,46 @@ class InterHouseScraper(BaseScraper):
                 }
 
                 # Extract address
-                address_element = item.select_one("span.c-result-item__title-address")
-                if address_element:
-                    property_data["adres"] = self.clean_text(address_element.text)
+                address_text = first_text(item, _ADDRESS_SEL)
+                if address_text is not None:
+                    property_data["adres"] = self.clean_text(address_text)
 
                 # Extract city/location
-                city_element = item.select_one("p.c-result-item__location-label")
-                if city_element:
-                    property_data["naam_dorp_stad"] = self.clean_text(
-                        city_element.text
-                    )  # Extract price
-                price_element = item.select_one("p.c-result-item__price-label")
-                if price_element:
-                    price_text = self.clean_text(price_element.text)
+                city_text = first_text(item, _LOCATION_SEL)
+                if city_text is not None:
+                    property_data["naam_dorp_stad"] = self.clean_text(city_text)
+
+                # Extract price
+                price_text = first_text(item, _PRICE_SEL)
+                if price_text is not None:
+                    price_text = self.clean_text(price_text)
                     # Store the numeric price in huurprijs
                     property_data["huurprijs"] = self.extract_rental_price(price_text)
 
-                # Extract area/size
-                # Find the element that contains "Woonoppervlakte"
-                for table_item in item.select("div.c-result-item__data-table-item"):
-                    header = table_item.select_one("p.c-result-item__data-header")
-                    if header and "Woonoppervlakte" in header.text:
-                        area_value = table_item.select_one(
-                            "p.c-result-item__data-value"
-                        )
-                        if area_value:
-                            # Clean and extract the area, preserving the m² format
-                            area_text = area_value.get_text(strip=True)
-                            # Replace <sup>2</sup> with ²
-                            area_text = re.sub(r"m</?sup>2</sup>", "m²", area_text)
-                            property_data["oppervlakte"] = self.clean_text(area_text)
-                            break
+                # Extract area/size from the row whose header contains "Woonoppervlakte"
+                area_values = _AREA_VALUE_XPATH(item)
+                if area_values:
+                    # Clean and extract the area, preserving the m² format
+                    area_text = area_values[0].text_content().strip()
+                    # Replace <sup>2</sup> with ²
+                    area_text = _SUP_RE.sub("m²", area_text)
+                    property_data["oppervlakte"] = self.clean_text(area_text)
 
                 # Extract link
-                link_element = item.select_one("div.c-result-item__button-wrapper a")
-                if not link_element:
+                link_elements = _BUTTON_LINK_SEL(item)
+                if not link_elements:
                     # Try alternative selector for links
-                    link_element = item.select_one("a.c-button")
+                    link_elements = _BUTTON_SEL(item)
 
-                if link_element and link_element.get("href"):
-                    property_data["link"] = urljoin(
-                        self.base_url, link_element.get("href")
-                    )
-                else:
+                # Read the href attribute once per element
+                href = link_elements[0].get("href") if link_elements else None
+                if not href:
                     # Try to find any link in the item that might point to the property
-                    any_link = item.select_one("a")
-                    if any_link and any_link.get("href"):
-                        property_data["link"] = urljoin(
-                            self.base_url, any_link.get("href")
-                        )
+                    any_links = _ANY_LINK_SEL(item)
+                    href = any_links[0].get("href") if any_links else None
+
+                if href:
+                    property_data["link"] = urljoin(self.base_url, href)
 
                 # Only add properties that have at least an address and location
                 if (
@@ -280,58 +394,63 @@ class InterHouseScraper(BaseScraper):
 
         try:
             # Extract address from detail page
-            address_element = soup.select_one("h1.c-listing-heading__address-part")
+            address_element = _DETAIL_ADDRESS_SEL.select_one(soup)
             if address_element:
                 details["adres"] = self.clean_text(address_element.text)
 
             # Extract city/location
-            city_element = soup.select_one("p.c-listing-heading__location-label")
+            city_element = _DETAIL_LOCATION_SEL.select_one(soup)
             if city_element:
                 details["naam_dorp_stad"] = self.clean_text(
                     city_element.text
                 )  # Extract price
-            price_element = soup.select_one("p.c-listing-heading__price-label")
+            price_element = _DETAIL_PRICE_SEL.select_one(soup)
             if price_element:
-                price_text = self.clean_text(price_element.text)
+                # The price is only parsed for its number, so stripping the text pieces
+                # in the same pass is enough; no separate whitespace cleanup
+                price_text = price_element.get_text(" ", strip=True)
                 # Store the numeric price in huurprijs
                 details["huurprijs"] = self.extract_rental_price(price_text)
 
             # Extract area/size
             # Look for the specifications table that contains the area information
-            specs_items = soup.select("div.c-listing-specs div.c-listing-specs__item")
+            specs_items = _SPECS_ITEM_SEL.select(soup)
             for spec in specs_items:
-                label_elem = spec.select_one("p.c-listing-specs__label")
-                value_elem = spec.select_one("p.c-listing-specs__value")
+                label_elem = _SPECS_LABEL_SEL.select_one(spec)
+                value_elem = _SPECS_VALUE_SEL.select_one(spec)
 
                 if label_elem and "Woonoppervlakte" in label_elem.text and value_elem:
                     # Clean and extract the area, preserving the m² format
                     area_text = value_elem.get_text(strip=True)
                     # Replace <sup>2</sup> with ²
-                    area_text = re.sub(r"m</?sup>2</sup>", "m²", area_text)
+                    area_text = _SUP_RE.sub("m²", area_text)
                     details["oppervlakte"] = self.clean_text(area_text)
                     break
 
             # If we couldn't find the area in the specifications table,
             # try looking elsewhere on the page
             if details["oppervlakte"] == "N/A":
-                for element in soup.select("p, div, span"):
+                # The text filter runs inside the selector, so only candidates are read
+                for element in _DETAIL_AREA_FALLBACK_SEL.select(soup):
                     text = element.get_text(strip=True)
-                    if "m²" in text or "m2" in text:
-                        area_match = re.search(r"(\d+)\s*(?:m²|m2)", text)
-                        if area_match:
-                            details["oppervlakte"] = f"{area_match.group(1)}m²"
-                            break
+                    area_match = _AREA_RE.search(text)
+                    if area_match:
+                        details["oppervlakte"] = f"{area_match.group(1)}m²"
+                        break
 
         except (AttributeError, TypeError) as e:
             self.logger.error("Error retrieving details from %s: %s", property_url, e)
 
         return details
 
-    def get_all_listings(self, max_pages: int = 5) -> List[Dict[str, str]]:
+    def get_all_listings(
+        self, max_pages: int = 5, max_price: Optional[int] = None
+    ) -> List[Dict[str, str]]:
         """Override get_all_listings to ensure proper handling with Selenium.
 
         Args:
             max_pages: Maximum number of pages to retrieve.
+            max_price: Skip properties with a known rental price above this value.
 
         Returns:
             List of all found rental properties.
@@ -344,15 +463,11 @@ class InterHouseScraper(BaseScraper):
             )
 
         try:
-            # Use the base class implementation
-            listings = super().get_all_listings(max_pages=max_pages)
-
-            # Close the driver when done
-            self._quit_driver()
-
-            return listings
+            # Use the base class implementation; every page reuses the same driver
+            return super().get_all_listings(max_pages=max_pages, max_price=max_price)
         except Exception as e:
             self.logger.error(f"Error in get_all_listings: {e}")
-            # Make sure to close the driver even if there's an error
-            self._quit_driver()
             return []
+        finally:
+            # Close the driver when done, also if there's an error
+            self._quit_driver()
@@ -4,7 +4,7 @@ Supports multiple locations including Amersfoort and Utrecht.
 """
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
 from scrapers.base_scraper import BaseScraper
@@ -14,6 +14,12 @@ from log_service import get_logger
 
 logger = get_logger("WebScraper")
 
+# Patterns compiled once at import instead of on every call
+_AREA_RE = re.compile(r"(\d+)\s*m²")
+_URL_ID_RE = re.compile(r"/(\d+)/")
+_POSTCODE_RE = re.compile(r"^\d{4}\s*[A-Z]{2}\s*")
+_DIGITS_RE = re.compile(r"\d+")
+
 
 class NederwoonScraper(BaseScraper):
     """Scraper specifically for the Nederwoon website."""
@@ -21,6 +27,16 @@ class NederwoonScraper(BaseScraper):
     # Define supported locations
     LOCATIONS = {"Amersfoort": "Amersfoort", "Utrecht": "Utrecht"}
 
+    # Add extended headers to mimic a real browser
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "nl,en-US;q=0.7,en;q=0.3",
+        # Removed Accept-Encoding to avoid Brotli compression issues
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    }
+
     def __init__(self, location: str = "Amersfoort"):
         """Initialize the Nederwoon scraper.
 
@@ -37,15 +53,6 @@ class NederwoonScraper(BaseScraper):
                 "Invalid location '%s', defaulting to Amersfoort", location
             )
             self.location = "Amersfoort"
-        # Add extended headers to mimic a real browser
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "nl,en-US;q=0.7,en;q=0.3",
-            # Removed Accept-Encoding to avoid Brotli compression issues
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
 
     def get_property_listings(self, page_num: int = 1) -> List[Dict[str, str]]:
         """Retrieve rental properties from the Nederwoon website.
@@ -115,7 +122,7 @@ class NederwoonScraper(BaseScraper):
                     li_text = self.clean_text(li.text)
                     if "woonoppervlakte" in li_text.lower() and "m²" in li_text:
                         # Extract the number before "m²"
-                        area_match = re.search(r"(\d+)\s*m²", li_text)
+                        area_match = _AREA_RE.search(li_text)
                         if area_match:
                             surface_area = f"{area_match.group(1)} m²"
                         break
@@ -127,7 +134,7 @@ class NederwoonScraper(BaseScraper):
                     unique_address = address
                     if property_url:
                         # Extract the ID from the URL (e.g., /36852/ from the URL)
-                        url_id_match = re.search(r"/(\d+)/", property_url)
+                        url_id_match = _URL_ID_RE.search(property_url)
                         if url_id_match:
                             unique_address = f"{address} ({url_id_match.group(1)})"
 
@@ -200,7 +207,7 @@ class NederwoonScraper(BaseScraper):
             for section in details_sections:
                 section_text = self.clean_text(section.text)
                 if "woonoppervlakte" in section_text.lower() and "m²" in section_text:
-                    area_match = re.search(r"(\d+)\s*m²", section_text)
+                    area_match = _AREA_RE.search(section_text)
                     if area_match:
                         details["oppervlakte"] = f"{area_match.group(1)} m²"
                         break
@@ -225,21 +232,24 @@ class NederwoonScraper(BaseScraper):
             return "N/A"
 
         # Remove postal code pattern (e.g. '3829DS ' or '1234 AB ')
-        clean_location = re.sub(r"^\d{4}\s*[A-Z]{2}\s*", "", location)
+        clean_location = _POSTCODE_RE.sub("", location)
 
         # Remove any remaining numbers and extra whitespace
-        clean_location = re.sub(r"\d+", "", clean_location).strip()
+        clean_location = _DIGITS_RE.sub("", clean_location).strip()
 
         return clean_location if clean_location else "N/A"
 
-    def get_all_listings(self, max_pages: int = 5) -> List[Dict[str, str]]:
+    def get_all_listings(
+        self, max_pages: int = 5, max_price: Optional[int] = None
+    ) -> List[Dict[str, str]]:
         """
         Nederwoon doesn't support pagination, so we override this method to enforce max_pages=1
 
         Args:
             max_pages: Maximum number of pages to retrieve (ignored for Nederwoon)
+            max_price: Skip properties with a known rental price above this value
 
         Returns:
             List of all found rental properties
         """
-        return super().get_all_listings(max_pages=1)
+        return super().get_all_listings(max_pages=1, max_price=max_price)
@@ -11,6 +11,13 @@ from scrapers.base_scraper import BaseScraper
 
 logger = logging.getLogger("WebScraper")
 
+# Patterns compiled once at import instead of on every call
+_POSTCODE_RE = re.compile(r"\d{4}\s*[A-Z]{2}\s*")
+_CITY_RE = re.compile(r"([^(]+)")
+_TRANSPARANT_RE = re.compile(
+    r"Transparant Meer informatie.*?Meer informatie Sluiten", re.DOTALL
+)
+
 
 class ParariusScraper(BaseScraper):
     """Scraper for the Pararius website."""
@@ -25,10 +32,10 @@ class ParariusScraper(BaseScraper):
         text = self.clean_text(text)
 
         # Remove postal code pattern (e.g. '3512 AG ' or '1234 AB ')
-        clean_text = re.sub(r"\d{4}\s*[A-Z]{2}\s*", "", text)
+        clean_text = _POSTCODE_RE.sub("", text)
 
         # Extract just the city name (before any parentheses)
-        city_match = re.match(r"([^(]+)", clean_text)
+        city_match = _CITY_RE.match(clean_text)
         if city_match:
             return city_match.group(1).strip()
 
@@ -47,8 +54,7 @@ class ParariusScraper(BaseScraper):
         text = self.clean_text(text)
 
         # Remove the "Transparant Meer informatie..." text block
-        transparant_pattern = r"Transparant Meer informatie.*?Meer informatie Sluiten"
-        clean_text = re.sub(transparant_pattern, "", text, flags=re.DOTALL)
+        clean_text = _TRANSPARANT_RE.sub("", text)
 
         # Make sure we have a clean rental price
         return clean_text.strip() or "N/A"
@@ -125,10 +131,9 @@ class ParariusScraper(BaseScraper):
 
                 # Extract link
                 link_elem = listing.select_one(".listing-search-item__link--title")
-                if link_elem and link_elem.get("href"):
-                    property_data["link"] = urljoin(
-                        "https://www.pararius.nl", link_elem.get("href")
-                    )
+                href = link_elem.get("href") if link_elem else None
+                if href:
+                    property_data["link"] = urljoin("https://www.pararius.nl", href)
 
                 properties.append(property_data)
 
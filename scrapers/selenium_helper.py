@@ -50,6 +50,19 @@ def create_chrome_driver(headless: bool = True) -> Optional["webdriver.Chrome"]:
         options.add_argument("--window-size=1920,1080")
         options.add_argument("--disable-extensions")
 
+        # Only the DOM is needed: return from driver.get() at DOMContentLoaded instead
+        # of waiting for every subresource (callers wait for their own elements), and
+        # don't download images at all
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option(
+            "prefs",
+            {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            },
+        )
+
         # For Docker environment
         if os.environ.get("DOCKER_ENVIRONMENT"):
             options.binary_location = "/usr/bin/google-chrome"
@@ -9,12 +9,14 @@ import re
 from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
-
 from log_service import get_logger
 from scrapers.base_scraper import BaseScraper
 
+# Patterns compiled once at import instead of on every call
+_LEADING_DIGIT_RE = re.compile(r"^(\d)")
+_AREA_UNIT_RE = re.compile(r"m[²2]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class VBTScraper(BaseScraper):
     """
@@ -56,11 +58,11 @@ class VBTScraper(BaseScraper):
             page_url = f"{self.base_url}/{page_num}"
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 page_url, headers=self.headers, cookies=self.cookies, timeout=15
             )
             response.raise_for_status()  # Raise error for bad responses
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = self.parse_response(response)
             properties = []
 
             # Find all property listings
@@ -102,7 +104,7 @@ class VBTScraper(BaseScraper):
                             price_element.text
                         )  # Ensure proper € symbol and formatting
                         if "€" not in price_text:
-                            price_text = re.sub(r"^(\d)", "€ \\1", price_text)
+                            price_text = _LEADING_DIGIT_RE.sub("€ \\1", price_text)
                         # Extract numeric price and store it
                         property_data["huurprijs"] = self.extract_rental_price(
                             price_text
@@ -120,7 +122,7 @@ class VBTScraper(BaseScraper):
                                 if "m²" not in size:
                                     size = size.replace("m2", "m²")
                                     # If no unit at all, add m²
-                                    if not re.search(r"m[²2]", size):
+                                    if not _AREA_UNIT_RE.search(size):
                                         size = f"{size} m²"
                                 property_data["oppervlakte"] = size
                                 break
@@ -161,11 +163,11 @@ class VBTScraper(BaseScraper):
         details = {}
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 property_url, headers=self.headers, cookies=self.cookies, timeout=15
             )
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = self.parse_response(response)
 
             # Extract basic information already available
             title_element = soup.select_one("h1")
@@ -211,7 +213,7 @@ class VBTScraper(BaseScraper):
         text = text.replace("m2", "m²")
 
         # Remove multiple spaces, newlines, tabs
-        text = re.sub(r"\s+", " ", text)
+        text = _WHITESPACE_RE.sub(" ", text)
 
         # Strip leading/trailing whitespace
         return text.strip()
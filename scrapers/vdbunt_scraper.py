@@ -3,13 +3,23 @@ VdBunt scraper module for scraping rental properties from the VdBunt website.
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
-from scrapers.base_scraper import BaseScraper
+from lxml.cssselect import CSSSelector
+
+from scrapers.base_scraper import BaseScraper, first_text
 
 logger = logging.getLogger("WebScraper")
 
+# Listing page selectors, translated to XPath once at import and matched by libxml2
+_ITEM_SEL = CSSSelector("li.al2woning.aanbodEntry")
+_LINK_SEL = CSSSelector("a.aanbodEntryLink")
+_ADDRESS_SEL = CSSSelector("h3.street-address")
+_LOCALITY_SEL = CSSSelector("span.locality")
+_PRICE_SEL = CSSSelector("span.kenmerk.huurprijs span.kenmerkValue")
+_AREA_SEL = CSSSelector("span.kenmerk.woonoppervlakte span.kenmerkValue")
+
 
 class VdBuntScraper(BaseScraper):
     """Scraper specifically for the VdBunt website."""
@@ -35,50 +45,36 @@ class VdBuntScraper(BaseScraper):
 
         url = f"{self.base_url}/aanbod/woningaanbod/huur/"
 
-        soup = self.get_page_content(url)
-        if not soup:
+        tree = self.get_page_tree(url)
+        if tree is None:
             return []
 
         listings = []
 
         # The website shows properties in li.al2woning.aanbodEntry elements
-        property_items = soup.select("li.al2woning.aanbodEntry")
+        property_items = _ITEM_SEL(tree)
 
         for item in property_items:
             try:
                 # Get the link to the property
-                link_element = item.select_one("a.aanbodEntryLink")
-                if not link_element:
+                link_elements = _LINK_SEL(item)
+                if not link_elements:
                     continue
 
-                property_url = urljoin(self.base_url, link_element.get("href", ""))
+                property_url = urljoin(self.base_url, link_elements[0].get("href", ""))
 
                 # Get the address
-                address_element = item.select_one("h3.street-address")
-                address = self.clean_text(
-                    address_element.text if address_element else None
-                )
+                address = self.clean_text(first_text(item, _ADDRESS_SEL))
 
                 # Location (city)
-                location_element = item.select_one("span.locality")
-                location = self.clean_text(
-                    location_element.text if location_element else None
-                )
+                location = self.clean_text(first_text(item, _LOCALITY_SEL))
 
                 # Rental price - we look for the element with "huurprijs" as attribute
-                price_element = item.select_one(
-                    "span.kenmerk.huurprijs span.kenmerkValue"
-                )
-                price_text = self.clean_text(
-                    price_element.text if price_element else None
-                )
-                price_numeric = self.extract_rental_price(
-                    price_text
-                )  # Surface area - we look for the element with "woonoppervlakte" as attribute
-                area_element = item.select_one(
-                    "span.kenmerk.woonoppervlakte span.kenmerkValue"
-                )
-                area = self.clean_text(area_element.text if area_element else None)
+                price_text = self.clean_text(first_text(item, _PRICE_SEL))
+                price_numeric = self.extract_rental_price(price_text)
+
+                # Surface area - we look for the element with "woonoppervlakte" as attribute
+                area = self.clean_text(first_text(item, _AREA_SEL))
 
                 listings.append(
                     {
@@ -154,14 +150,17 @@ class VdBuntScraper(BaseScraper):
         return details
 
     # Override get_all_listings to force max_pages=1 for VdBunt
-    def get_all_listings(self, max_pages: int = 5) -> List[Dict[str, str]]:
+    def get_all_listings(
+        self, max_pages: int = 5, max_price: Optional[int] = None
+    ) -> List[Dict[str, str]]:
         """
         VdBunt doesn't support pagination, so we override this method to enforce max_pages=1
 
         Args:
             max_pages: Maximum number of pages to retrieve (ignored for VdBunt)
+            max_price: Skip properties with a known rental price above this value
 
         Returns:
             List of all found rental properties
         """
-        return super().get_all_listings(max_pages=1)
+        return super().get_all_listings(max_pages=1, max_price=max_price)
@@ -11,28 +11,27 @@ import requests
 
 from scrapers.base_scraper import BaseScraper
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError as exc:
-    raise ImportError(
-        "BeautifulSoup4 is required. Install it using 'pip install beautifulsoup4'"
-    ) from exc
-
 logger = logging.getLogger("WebScraper")
 
+# Patterns compiled once at import instead of on every call
+_POSTCODE_RE = re.compile(r"^\d{4}\s*[A-Z]{2}\s*")
+_LOCATION_RE = re.compile(r"\b\d{4}\s*[A-Z]{2}\b\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)")
+_AREA_RE = re.compile(r"(\d+)\s*(?:m²|m2|㎡)")
+
 
 class ZonnenbergScraper(BaseScraper):
     """Scraper specifically for the Zonnenberg Makelaardij website."""
 
+    # Add extended headers to mimic a real browser
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "nl,en-US;q=0.7,en;q=0.3",
+    }
+
     def __init__(self):
         """Initialize the Zonnenberg scraper."""
         super().__init__("https://zonnenbergmakelaardij.nl")
-        # Add extended headers to mimic a real browser
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "nl,en-US;q=0.7,en;q=0.3",
-        }
 
     def get_property_listings(self, page_num: int = 1) -> List[Dict[str, str]]:
         """Retrieve rental properties from the Zonnenberg website.
@@ -48,9 +47,7 @@ class ZonnenbergScraper(BaseScraper):
         # Zonnenberg loads all properties on a single page
         url = f"{self.base_url}/woningaanbod/huur/"
 
-        # Gebruik een eigen requests sessie om meer controle te hebben
-        session = requests.Session()
-        response = session.get(url, headers=self.headers, timeout=30)
+        response = self.session.get(url, headers=self.headers, timeout=30)
         if response.status_code != 200:
             logger.error(
                 "Failed to get content from %s, status code: %s",
@@ -59,7 +56,7 @@ class ZonnenbergScraper(BaseScraper):
             )
             return []
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = self.parse_response(response)
         if not soup:
             logger.error("Failed to parse HTML from %s", url)
             return []
@@ -123,7 +120,7 @@ class ZonnenbergScraper(BaseScraper):
                 if place_element:
                     place_text = self.clean_text(place_element.text)
                     # Strip postcode (4 cijfers gevolgd door 2 letters)
-                    place = re.sub(r"^\d{4}\s*[A-Z]{2}\s*", "", place_text)
+                    place = _POSTCODE_RE.sub("", place_text)
 
                 # Area - directe extractie uit het artikel
                 area_element = item.select_one("span.dimension")
@@ -170,9 +167,9 @@ class ZonnenbergScraper(BaseScraper):
             Dictionary with attributes of the rental property.
         """
         try:
-            response = requests.get(property_url, headers=self.headers, timeout=15)
+            response = self.session.get(property_url, headers=self.headers, timeout=15)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = self.parse_response(response)
         except (requests.RequestException, ValueError) as e:
             logger.error("Fout bij ophalen %s: %s", property_url, e)
             return {
@@ -204,8 +201,8 @@ class ZonnenbergScraper(BaseScraper):
             if location_element:
                 location_text = self.clean_text(location_element.text)
                 # Strip postcode (4 cijfers gevolgd door 2 letters)
-                details["naam_dorp_stad"] = re.sub(
-                    r"^\d{4}\s*[A-Z]{2}\s*", "", location_text
+                details["naam_dorp_stad"] = _POSTCODE_RE.sub(
+                    "", location_text
                 )  # Get price
             price_element = soup.select_one("span.price")
             if price_element:
@@ -227,10 +224,7 @@ class ZonnenbergScraper(BaseScraper):
                     )
                 else:
                     # Zoek in de adrestekst
-                    location_match = re.search(
-                        r"\b\d{4}\s*[A-Z]{2}\b\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-                        details["adres"],
-                    )
+                    location_match = _LOCATION_RE.search(details["adres"])
                     if location_match and location_match.group(1):
                         details["naam_dorp_stad"] = location_match.group(1)
 
@@ -247,7 +241,7 @@ class ZonnenbergScraper(BaseScraper):
                             or "EUR" in text
                             or "prijs" in text.lower()
                         ):
-                            size_match = re.search(r"(\d+)\s*(?:m²|m2|㎡)", text)
+                            size_match = _AREA_RE.search(text)
                             if size_match:
                                 details["oppervlakte"] = f"{size_match.group(1)}m²"
                                 break
@@ -0,0 +1,43 @@
+"""
+Hulpfuncties voor de HuurhuisWebscraper.
+
+Deze module bevat kleine, gedeelde functies die door zowel de scrapers als de
+database-laag gebruikt worden.
+"""
+
+from typing import Any, Optional
+
+
+def normalize_price(value: Any) -> Optional[int]:
+    """
+    Normaliseer een huurprijs naar een geheel getal in euro's.
+
+    Scrapers leveren de prijs als int (of "N/A"), terwijl de database de prijs als
+    tekst opslaat. Door beide kanten naar een int te normaliseren kunnen prijzen
+    direct vergeleken en gehasht worden.
+
+    Een prijs die niet te lezen is (zoals "N/A" of "Prijs op aanvraag") wordt None en
+    niet 0, zodat zo'n woning niet als gratis door het prijsfilter komt. Ook 0 zelf
+    betekent onbekend: extract_rental_price geeft 0 terug als het mislukt.
+
+    Args:
+        value: De huurprijs als int, float of tekst
+
+    Returns:
+        De huurprijs als int, of None als de prijs onbekend is
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            value = int(value)
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+    # bool is een subklasse van int, maar geen prijs
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if value != value or value <= 0:  # NaN of geen echte prijs
+        return None
+    return int(value)